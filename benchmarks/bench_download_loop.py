@@ -0,0 +1,82 @@
+"""
+Measures the tool download loop's throughput over loopback, where the network is never the
+bottleneck, so the numbers show the loop's own per-chunk overhead.
+
+    python benchmarks/bench_download_loop.py [size in MiB]
+
+"before" replays the original loop (8 KiB iter_content chunks, one progress signal per chunk),
+"after" runs SetupWorker._download_file as it is now.
+"""
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from main import SetupWorker # noqa: E402
+
+
+def serve(payload):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            view = memoryview(payload)
+            for offset in range(0, len(payload), 1024 * 1024):
+                self.wfile.write(view[offset:offset + 1024 * 1024])
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/tool"
+
+
+def legacy_download(worker, url, destination, tool_name):
+    """The download loop as it was before progress coalescing and buffer reuse."""
+    response = requests.get(url, stream=True)
+    response.raise_for_status()
+    total_size = int(response.headers.get('content-length', 0))
+    downloaded_size = 0
+    with open(destination, 'wb') as f:
+        for chunk in response.iter_content(chunk_size=8192):
+            if chunk:
+                f.write(chunk)
+                downloaded_size += len(chunk)
+                if total_size > 0:
+                    progress = int(downloaded_size * 100 / total_size)
+                    worker.update_progress_bar.emit(progress, f"Downloading {tool_name}: {progress}%")
+    worker.update_progress_bar.emit(100, f"Downloading {tool_name}: 100%")
+
+
+def run(label, download, size):
+    work_dir = tempfile.mkdtemp()
+    worker = SetupWorker(work_dir, store_dir=work_dir)
+    signals = []
+    worker.update_progress_bar.connect(lambda value, text: signals.append(value))
+    destination = os.path.join(work_dir, "tool")
+    started = time.perf_counter()
+    download(worker, destination)
+    elapsed = time.perf_counter() - started
+    assert os.path.getsize(destination) == size
+    print(f"{label:>6}: {size / elapsed / 2**20:8.1f} MiB/s  {elapsed:6.2f} s  {len(signals):6d} progress signals")
+
+
+def main():
+    size = int(sys.argv[1]) * 2**20 if len(sys.argv) > 1 else 256 * 2**20
+    server, url = serve(os.urandom(size))
+    try:
+        run("before", lambda worker, destination: legacy_download(worker, url, destination, "FFmpeg"), size)
+        run("after", lambda worker, destination: worker._download_file(url, destination, "FFmpeg"), size)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,44 @@
 import subprocess
 import os
+import json
+import hashlib
 import sys
 import requests
+import urllib3
 import zipfile
 import tarfile
 import shutil
 import stat # For setting file permissions on Linux/macOS
+import platform
+import threading
+import time
+import re
+import functools
+import urllib.parse
+import itertools
+import importlib
+import importlib.util
+import multiprocessing
+import logging
+import queue
+import atexit
+import secrets
+import socket
+import tempfile
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from collections import deque
+if sys.platform.startswith("linux"):
+    import fcntl # For reflink copies into the shared tool store
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLineEdit, QPushButton, QComboBox, QLabel, QTextEdit, QProgressBar,
-    QMessageBox
+    QLineEdit, QPushButton, QComboBox, QLabel, QPlainTextEdit, QProgressBar,
+    QMessageBox, QSpinBox, QListWidget
 )
-from PyQt5.QtCore import QThread, pyqtSignal, Qt, QUrl
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal, Qt, QUrl
 from PyQt5.QtGui import QFont, QDesktopServices # For opening URLs
 
 # --- Helper function to find executables ---
@@ -33,7 +59,597 @@ def find_executable(name, path_list):
                 return full_path_exe
     return None
 
+# --- Tool sources ---
+# Each tool has one or more artifacts per platform. An artifact is one file with one checksum,
+# served from one URL. Different artifacts are alternative builds of the tool, ranked against each
+# other and installed from scratch when the preferred one fails; a partial download is only
+# resumed from the URL it came from.
+TOOL_SOURCES = {
+    "yt-dlp": {
+        "win32": [{
+            "filename": "yt-dlp.exe",
+            "url": "https://github.com/yt-dlp/yt-dlp/releases/latest/download/yt-dlp.exe",
+            "checksum": ("sha256", "https://github.com/yt-dlp/yt-dlp/releases/latest/download/SHA2-256SUMS"),
+        }],
+        "default": [{
+            "filename": "yt-dlp",
+            "url": "https://github.com/yt-dlp/yt-dlp/releases/latest/download/yt-dlp",
+            "checksum": ("sha256", "https://github.com/yt-dlp/yt-dlp/releases/latest/download/SHA2-256SUMS"),
+        }],
+    },
+    "FFmpeg": {
+        "win32": [{
+            "filename": "ffmpeg-release-full.zip",
+            "url": "https://www.gyan.dev/ffmpeg/builds/ffmpeg-release-full.zip",
+            "checksum": ("sha256", "https://www.gyan.dev/ffmpeg/builds/ffmpeg-release-full.zip.sha256"),
+        }, {
+            "filename": "ffmpeg-master-latest-win64-gpl.zip",
+            "url": "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/ffmpeg-master-latest-win64-gpl.zip",
+            "checksum": ("sha256", "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/checksums.sha256"),
+        }],
+        "darwin": [{
+            # Note: This URL might need updating for newer FFmpeg versions.
+            "filename": "ffmpeg-latest.zip",
+            "url": "https://evermeet.cx/ffmpeg/ffmpeg-latest.zip", # Using latest for better future-proofing
+            "checksum": None, # evermeet.cx only publishes GPG signatures
+        }],
+        "default": [{
+            # Note: These URLs are for AMD64 static builds. Adjust for other architectures if needed.
+            "filename": "ffmpeg-release-amd64-static.tar.xz",
+            "url": "https://johnvansickle.com/ffmpeg/releases/ffmpeg-release-amd64-static.tar.xz",
+            "checksum": ("md5", "https://johnvansickle.com/ffmpeg/releases/ffmpeg-release-amd64-static.tar.xz.md5"), # Only MD5 is published
+        }, {
+            "filename": "ffmpeg-master-latest-linux64-gpl.tar.xz",
+            "url": "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/ffmpeg-master-latest-linux64-gpl.tar.xz",
+            "checksum": ("sha256", "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/checksums.sha256"),
+        }],
+    },
+}
+
+def tool_artifacts(tool_name):
+    """Returns the artifacts of a tool for the current platform."""
+    sources = TOOL_SOURCES[tool_name]
+    return sources.get(sys.platform, sources["default"])
+
+def _url_host(url):
+    return urllib.parse.urlsplit(url).netloc
+
+
+# --- Download helpers ---
+class IncompleteDownloadError(requests.exceptions.RequestException):
+    """Raised when a transfer ends before the whole file has been received."""
+
+
+def _content_range_total(content_range):
+    """Returns the total size from a 'Content-Range: bytes a-b/total' header, or None if unknown."""
+    if not content_range or "/" not in content_range:
+        return None
+    total = content_range.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
+_pwrite_lock = threading.Lock()
+
+def _pwrite(fd, data, offset):
+    """Writes 'data' at 'offset' without moving a shared file position.
+    Windows has no os.pwrite, so seek+write is serialised there instead."""
+    if hasattr(os, "pwrite"):
+        while data:
+            written = os.pwrite(fd, data, offset)
+            data = data[written:]
+            offset += written
+    else:
+        with _pwrite_lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            while data:
+                written = os.write(fd, data)
+                data = data[written:]
+
+
+def _iter_raw_chunks(response, buffer):
+    """
+    Yields memoryview slices of 'buffer' filled straight from a streamed response, so the
+    download loop allocates nothing per chunk. Each slice is only valid until the next one.
+    urllib3 errors are translated the way requests' iter_content does, so callers can keep
+    catching requests exceptions.
+    """
+    view = memoryview(buffer)
+    while True:
+        try:
+            size = response.raw.readinto(buffer)
+        except urllib3.exceptions.ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except urllib3.exceptions.ReadTimeoutError as e:
+            raise requests.exceptions.ConnectionError(e)
+        except urllib3.exceptions.SSLError as e:
+            raise requests.exceptions.SSLError(e)
+        if not size:
+            return
+        yield view[:size]
+
+
+# --- Archive decompression backends ---
+@functools.lru_cache(maxsize=None)
+def _xz_decoder():
+    """
+    Finds a multi-threaded .xz decoder on the system: returns (name, argv) for a decoder
+    that reads stdin and writes stdout, or None to use Python's single-threaded lzma.
+    Both only parallelise archives written as several xz blocks, which most big builds are.
+    """
+    pixz = shutil.which("pixz")
+    if pixz:
+        return ("pixz", [pixz, "-d"])
+    xz = shutil.which("xz")
+    if xz:
+        try:
+            output = subprocess.run([xz, "--version"], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            output = ""
+        match = re.search(r"(\d+)\.(\d+)", output)
+        if match and (int(match.group(1)), int(match.group(2))) >= (5, 4): # Threaded decoding came in 5.4
+            return ("xz", [xz, "-d", "-c", "-q", "-T0"])
+    return None
+
+def _xz_backend_name(decoder):
+    return f"{decoder[0]} (multi-threaded)" if decoder else "Python lzma (single-threaded)"
+
+
+class _ExternalXzStream:
+    """
+    Runs an external .xz decoder over a compressed byte source. A feeder thread copies the
+    source into the decoder's stdin while the caller reads plain data from 'stdout'.
+    With drain_source, close() still reads the rest of the source (e.g. to finish a checksum)
+    after decoding has stopped.
+    """
+
+    def __init__(self, argv, source, drain_source=False):
+        self.process = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self.stdout = self.process.stdout
+        self._source = source
+        self._drain_source = drain_source
+        self._stop = threading.Event()
+        self._error = None
+        self._feeder = threading.Thread(target=self._feed, name="xz-feeder", daemon=True)
+        self._feeder.start()
+
+    def _feed(self):
+        try:
+            while True:
+                data = self._source.read(1024 * 1024)
+                if not data:
+                    break
+                if self._stop.is_set():
+                    if not self._drain_source:
+                        break
+                    continue # Keep reading (and hashing) without decoding
+                try:
+                    self.process.stdin.write(data)
+                except OSError: # Decoder gone: either close() stopped it or it failed on bad data
+                    if not self._drain_source:
+                        break
+                    self._stop.set()
+        except Exception as e:
+            self._error = e
+        finally:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+
+    def close(self):
+        """Stops the decoder and the feeder. Re-raises an error from reading the source,
+        since a failed download is the real cause of any decode error it led to."""
+        self._stop.set()
+        if self.process.poll() is None:
+            self.process.kill()
+        self._feeder.join()
+        self.stdout.close()
+        self.process.wait()
+        if self._error:
+            raise self._error
+
+
+def _executable_member_name(member_path):
+    """Returns the executable name of an archive member path, without any .exe suffix."""
+    name = os.path.basename(member_path.rstrip("/"))
+    return name[:-4] if name.lower().endswith(".exe") else name
+
+
+class _ProgressReader:
+    """Read-only file wrapper that reports the running byte count after every read
+    and optionally feeds the data to a _StreamingDigest."""
+
+    def __init__(self, raw, on_read, digest=None):
+        self._raw = raw
+        self._on_read = on_read
+        self._digest = digest
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self._raw.read(size)
+        if self._digest:
+            self._digest.update(data)
+        self.bytes_read += len(data)
+        self._on_read(self.bytes_read)
+        return data
+
+
+# --- Download integrity ---
+class ChecksumMismatchError(Exception):
+    """Raised when a downloaded file does not match the publisher's checksum."""
+
+
+class _StreamingDigest:
+    """
+    Hashes a download while it is being written, so verification needs no second read.
+    SHA-256 is always computed; the publisher's algorithm (e.g. MD5) is added when it differs.
+    """
+
+    def __init__(self, algorithm="sha256"):
+        self.algorithms = sorted({"sha256", algorithm})
+        self.reset()
+
+    def reset(self):
+        self._hashers = {name: hashlib.new(name) for name in self.algorithms}
+        self.size = 0
+
+    def update(self, data):
+        for hasher in self._hashers.values():
+            hasher.update(data)
+        self.size += len(data)
+
+    def catch_up(self, path, size):
+        """Makes the digest cover the first 'size' bytes of 'path'.
+        Only reads from disk when the bytes were not hashed as they arrived (a resume after
+        a restart, or a segmented download that was written out of order)."""
+        if self.size == size:
+            return
+        self.reset()
+        with open(path, 'rb') as f:
+            while self.size < size:
+                block = f.read(min(1024 * 1024, size - self.size))
+                if not block:
+                    break
+                self.update(block)
+
+    def hexdigest(self, algorithm):
+        return self._hashers[algorithm].hexdigest()
+
+
+def _parse_checksum_file(text, filename):
+    """Finds the checksum for 'filename' in a checksum file.
+    Understands both 'HASH  NAME' listings (sha256sum/md5sum style) and files holding only a hash."""
+    lines = [line.split() for line in text.splitlines() if line.strip()]
+    for parts in lines:
+        if len(parts) >= 2 and parts[-1].lstrip("*") == filename:
+            return parts[0].lower()
+    if len(lines) == 1 and len(lines[0]) == 1:
+        return lines[0][0].lower()
+    return None
+
+
+# --- JSON state files ---
+def _load_json(path):
+    """Returns the dict stored in a JSON file, or None if it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+def _write_json_atomic(path, data, mode=None):
+    """Writes a JSON file through a temp file and a rename, so readers never see half a file.
+    The temp name is unique per process and thread, so concurrent writers don't collide.
+    'mode' sets the permissions explicitly instead of leaving them to the umask."""
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    if mode is not None:
+        os.chmod(temp_path, mode)
+    os.replace(temp_path, path)
+
+
+# --- HTTP validators ---
+# ETag / Last-Modified of each tool URL, so update checks can be answered with a 304
+VALIDATORS_FILENAME = "validators.json"
+_validators_lock = threading.Lock()
+
+def load_validators(tools_dir, url):
+    """Returns the stored {'etag', 'last_modified'} validators for 'url' (possibly empty)."""
+    validators = _load_json(os.path.join(tools_dir, VALIDATORS_FILENAME)) or {}
+    return validators.get(url, {})
+
+def save_validators(tools_dir, url, headers):
+    """Stores the ETag / Last-Modified from response 'headers' for 'url'. Returns the validators."""
+    headers = {name.lower(): value for name, value in headers.items()} # Plain dicts may use any case
+    entry = {}
+    if headers.get("etag"):
+        entry["etag"] = headers["etag"]
+    if headers.get("last-modified"):
+        entry["last_modified"] = headers["last-modified"]
+    if entry:
+        path = os.path.join(tools_dir, VALIDATORS_FILENAME)
+        with _validators_lock:
+            validators = _load_json(path) or {}
+            validators[url] = entry
+            _write_json_atomic(path, validators)
+    return entry
+
+def _conditional_headers(validators):
+    """Builds If-None-Match / If-Modified-Since headers from stored validators."""
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+# --- Mirror history ---
+# Smoothed throughput per mirror URL, so later runs start with the mirror that was fastest
+MIRRORS_FILENAME = "mirrors.json"
+_mirrors_lock = threading.Lock()
+
+def load_mirror_history(tools_dir):
+    """Returns {url: {'bytes_per_sec': float}} for every mirror used before."""
+    return _load_json(os.path.join(tools_dir, MIRRORS_FILENAME)) or {}
+
+def record_mirror_speed(tools_dir, url, bytes_per_sec):
+    """Folds a measured transfer speed into the mirror's moving average."""
+    path = os.path.join(tools_dir, MIRRORS_FILENAME)
+    with _mirrors_lock:
+        history = _load_json(path) or {}
+        previous = history.get(url, {}).get("bytes_per_sec")
+        # Exponential moving average: recent runs count more, one bad run doesn't ban a mirror
+        speed = bytes_per_sec if previous is None else 0.5 * previous + 0.5 * bytes_per_sec
+        history[url] = {"bytes_per_sec": speed, "updated": int(time.time())}
+        _write_json_atomic(path, history)
+
+
+# --- Tool manifest ---
+# Records what SetupWorker verified, so later launches can trust the tools after a cheap stat()
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_TOOLS = ("yt-dlp", "ffmpeg", "ffprobe")
+
+def _file_sha256(path):
+    """Returns the hex SHA-256 of a file, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _tool_version(path):
+    """Runs the tool's version command and returns the first line of output, or None if it fails."""
+    version_flag = "--version" if os.path.basename(path).startswith("yt-dlp") else "-version"
+    try:
+        result = subprocess.run([path, version_flag], capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    lines = result.stdout.strip().splitlines()
+    return lines[0] if result.returncode == 0 and lines else None
+
+def _manifest_entry(path, version, sha256):
+    file_stat = os.stat(path)
+    return {
+        "file": os.path.basename(path),
+        "size": file_stat.st_size,
+        "mtime_ns": file_stat.st_mtime_ns,
+        "version": version,
+        "sha256": sha256,
+    }
+
+def load_tool_manifest(tools_dir):
+    """Returns the saved manifest dict, or None if it is missing or unreadable."""
+    return _load_json(os.path.join(tools_dir, MANIFEST_FILENAME))
+
+def write_tool_manifest(tools_dir, manifest):
+    """Saves the manifest atomically, so a crash never leaves a half-written file behind."""
+    _write_json_atomic(os.path.join(tools_dir, MANIFEST_FILENAME), manifest)
+
+def validate_tool_manifest(tools_dir):
+    """
+    Checks the manifest against the files on disk using only stat().
+    Returns {tool name: executable path} when every tool still matches its recorded size
+    and mtime, or None when the manifest is missing or stale and a full verification is needed.
+    """
+    manifest = load_tool_manifest(tools_dir)
+    if not manifest:
+        return None
+    tool_paths = {}
+    for name in MANIFEST_TOOLS:
+        entry = manifest.get(name)
+        if not entry:
+            return None
+        path = os.path.join(tools_dir, entry["file"])
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            return None
+        if (file_stat.st_size != entry["size"] or file_stat.st_mtime_ns != entry["mtime_ns"]
+                or not os.access(path, os.X_OK)):
+            return None
+        tool_paths[name] = path
+    return tool_paths
+
+
+# --- Shared tool store ---
+# A per-host, content-addressed cache of verified tools. Objects are named by their SHA-256 and
+# hardlinked (or reflinked) into each install's tools_dir, so new installs need no network access.
+TOOL_STORE_ENV = "YTD_TOOL_STORE" # Moves the store, e.g. onto the same filesystem as the installs
+
+def tool_store_dir():
+    """Returns the directory of the shared tool store for this user/host."""
+    if os.environ.get(TOOL_STORE_ENV):
+        return os.environ[TOOL_STORE_ENV]
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "yt-downloader", "tool-store")
+
+def _store_platform_key():
+    # Binaries are only interchangeable between installs on the same OS and CPU architecture
+    return f"{sys.platform}-{platform.machine().lower()}"
+
+def _store_object_path(store_dir, sha256):
+    return os.path.join(store_dir, "objects", sha256[:2], sha256)
+
+def _trusted_store_file(path):
+    """
+    True if 'path' is a regular file that only this user (or root) could have written.
+    Linked tools are run, and the index that vouches for them lives in the same store, so a
+    file another user can write would let them substitute a binary. Windows ACLs aren't
+    checked; the default store there is inside the user's profile.
+    """
+    try:
+        file_stat = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISREG(file_stat.st_mode):
+        return False
+    if sys.platform == "win32":
+        return True
+    return file_stat.st_uid in (os.getuid(), 0) and not file_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+def load_store_index(store_dir):
+    """Returns the store index ({platform key: {file name: entry}}), or {} if there is none
+    or it could have been written by another user."""
+    path = os.path.join(store_dir, "index.json")
+    if not _trusted_store_file(path):
+        return {}
+    return _load_json(path) or {}
+
+def _write_store_index(store_dir, index):
+    # 0644 whatever the umask: _trusted_store_file rejects a group-writable index
+    _write_json_atomic(os.path.join(store_dir, "index.json"), index, mode=0o644)
+
+def _link_or_copy(source, destination, mode=None):
+    """
+    Places 'source' at 'destination' sharing storage where possible: a hardlink first,
+    then a copy-on-write reflink (Linux), then a plain copy. The result appears atomically.
+    'mode' is applied before the rename; a hardlink shares it with 'source'.
+    Returns the method that was used.
+    """
+    temp_path = f"{destination}.{os.getpid()}.tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    try:
+        os.link(source, temp_path)
+        method = "hardlink"
+    except OSError: # Different filesystem, or links not supported
+        method = "copy"
+        with open(source, 'rb') as src_file, open(temp_path, 'wb') as dst_file:
+            if sys.platform.startswith("linux"):
+                try:
+                    fcntl.ioctl(dst_file.fileno(), 0x40049409, src_file.fileno()) # FICLONE
+                    method = "reflink"
+                except OSError:
+                    pass
+            if method == "copy":
+                shutil.copyfileobj(src_file, dst_file, 1024 * 1024)
+        shutil.copymode(source, temp_path)
+    if mode is not None:
+        os.chmod(temp_path, mode)
+    os.replace(temp_path, destination)
+    return method
+
+
+# --- Shared HTTP session ---
+HTTP_POOL_CONNECTIONS = 8 # Hosts kept in the pool (GitHub, its CDN, the FFmpeg mirrors)
+HTTP_POOL_MAXSIZE = 16 # Keep-alive connections per host; covers segmented downloads on every mirror
+TEMPORARY_REDIRECT_TTL = 60.0 # Seconds a 302/307 target is reused; CDN links are signed and expire
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def _http_retry_policy():
+    # Retries connection setup and transient server errors before any body is read;
+    # interrupted bodies are resumed by the download loop itself
+    return Retry(
+        total=3, connect=3, read=2, status=3, backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"HEAD", "GET"}),
+        respect_retry_after_header=True, raise_on_status=False,
+    )
+
+
+class _RedirectCache:
+    """Remembers where redirecting URLs ended up so repeat requests skip the hops."""
+
+    def __init__(self):
+        self._targets = {} # URL -> (final URL, expiry as monotonic time or None for permanent)
+        self._lock = threading.Lock()
+
+    def lookup(self, url):
+        with self._lock:
+            target, expires = self._targets.get(url, (url, None))
+            if expires is not None and time.monotonic() >= expires:
+                del self._targets[url]
+                return url
+            return target
+
+    def record(self, url, response):
+        if not response.history or response.status_code >= 400:
+            return
+        # A chain is only as permanent as its least permanent hop
+        permanent = all(hop.status_code in (301, 308) for hop in response.history)
+        with self._lock:
+            self._targets[url] = (response.url, None if permanent else time.monotonic() + TEMPORARY_REDIRECT_TTL)
+
+    def forget(self, url):
+        with self._lock:
+            self._targets.pop(url, None)
+
+
+class _PooledSession(requests.Session):
+    """Session that sends requests straight to cached redirect targets, falling back to the original URL."""
+
+    def __init__(self):
+        super().__init__()
+        self.redirects = _RedirectCache()
+
+    def request(self, method, url, *args, **kwargs):
+        target = self.redirects.lookup(url)
+        if target != url:
+            try:
+                response = super().request(method, target, *args, **kwargs)
+                if response.status_code < 400 or response.status_code == 416: # 416 is a resume answer, not a stale link
+                    return response
+                response.close()
+            except requests.exceptions.RequestException:
+                pass
+            self.redirects.forget(url) # Expired signed link or moved target; resolve it again
+        response = super().request(method, url, *args, **kwargs)
+        self.redirects.record(url, response)
+        return response
+
+
+def http_session():
+    """Returns the process-wide pooled session shared by all tool network traffic."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = _PooledSession()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                                  max_retries=_http_retry_policy())
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            # Tool archives are already compressed; asking for identity lets the download loop
+            # read raw bytes straight into its buffer with nothing to decode
+            session.headers["Accept-Encoding"] = "identity"
+            _http_session = session
+        return _http_session
+
+
 # --- Worker Thread for Downloading Tools ---
+class SetupCancelled(Exception):
+    """Raised inside a setup or update worker once cancel() was called."""
+
+
 class SetupWorker(QThread):
     """
     Thread for downloading and extracting yt-dlp and ffmpeg.
@@ -42,9 +658,37 @@ class SetupWorker(QThread):
     update_progress_bar = pyqtSignal(int, str) # value, text
     setup_finished = pyqtSignal(bool, str) # success, message
 
-    def __init__(self, tools_dir):
+    request_timeout = (10, 60) # (connect, read) seconds, so a stalled transfer fails and gets resumed
+    max_resume_attempts = 5 # Consecutive attempts without progress before giving up
+    resume_delay = 1.0 # Seconds to wait before a resume, multiplied by the attempt number
+    download_segments = 4 # Parallel byte-range connections for large archives
+    min_segment_size = 4 * 1024 * 1024 # Files smaller than two segments use a single stream
+    stream_extract = True # Install .tar.xz builds straight from the HTTP response
+    parallel_decompression = True # Use pixz / xz -T0 when installed, and extract zip members in parallel
+    probe_timeout = 5 # Seconds to wait for a mirror's latency probe
+    download_chunk_size = 1024 * 1024 # Bytes read per loop iteration into a reused buffer
+    progress_interval = 0.1 # Minimum seconds between progress signals
+
+    def __init__(self, tools_dir, store_dir=None):
         super().__init__()
         self.tools_dir = tools_dir
+        self.store_dir = store_dir or tool_store_dir()
+        self._store_sources = {} # File name -> SHA-256 of tools linked from the shared store
+        self.session = http_session() # Setup, checksums and update checks reuse the same keep-alive connections
+        # Per-tool progress, shared by the concurrent setup tasks
+        self._tool_progress = {"yt-dlp": 0, "FFmpeg": 0}
+        self._progress_lock = threading.Lock()
+        self._last_progress_emit = (None, 0.0) # (text, monotonic time) of the last emitted update
+        self._cancelled = False
+
+    def cancel(self):
+        """Asks the thread to stop. It notices between steps and on every progress update,
+        keeping partial downloads for the next run, and then finishes without a result."""
+        self._cancelled = True
+
+    def _check_cancelled(self):
+        if self._cancelled:
+            raise SetupCancelled()
 
     def run(self):
         try:
@@ -53,130 +697,703 @@ class SetupWorker(QThread):
                 os.makedirs(self.tools_dir)
                 self.update_status.emit(f"Created tools directory: {self.tools_dir}")
 
-            # --- Download yt-dlp ---
-            yt_dlp_name = "yt-dlp"
-            if sys.platform == "win32":
-                yt_dlp_url = "https://github.com/yt-dlp/yt-dlp/releases/latest/download/yt-dlp.exe"
-                yt_dlp_filename = "yt-dlp.exe"
-            else:
-                yt_dlp_url = "https://github.com/yt-dlp/yt-dlp/releases/latest/download/yt-dlp"
-                yt_dlp_filename = "yt-dlp"
-
-            yt_dlp_path = os.path.join(self.tools_dir, yt_dlp_filename)
-
-            if not os.path.exists(yt_dlp_path):
-                self.update_status.emit(f"Downloading {yt_dlp_filename}...")
-                self._download_file(yt_dlp_url, yt_dlp_path, "yt-dlp")
-                if sys.platform != "win32": # Set execute permissions for Linux/macOS
-                    os.chmod(yt_dlp_path, os.stat(yt_dlp_path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
-                self.update_status.emit(f"{yt_dlp_filename} downloaded.")
-            else:
-                self.update_status.emit(f"{yt_dlp_filename} already exists.")
-
-            # --- Download FFmpeg ---
-            ffmpeg_name = "ffmpeg"
-            ffprobe_name = "ffprobe"
-            ffmpeg_path_in_tools = os.path.join(self.tools_dir, ffmpeg_name)
-            ffprobe_path_in_tools = os.path.join(self.tools_dir, ffprobe_name)
-
-            if sys.platform == "win32":
-                ffmpeg_archive_url = "https://www.gyan.dev/ffmpeg/builds/ffmpeg-release-full.zip"
-                ffmpeg_archive_filename = "ffmpeg-release-full.zip"
-            elif sys.platform == "darwin": # macOS
-                # Note: This URL might need updating for newer FFmpeg versions.
-                ffmpeg_archive_url = "https://evermeet.cx/ffmpeg/ffmpeg-latest.zip" # Using latest for better future-proofing
-                ffmpeg_archive_filename = "ffmpeg-latest.zip"
-            else: # Linux
-                # Note: This URL is for AMD64 static builds. Adjust for other architectures if needed.
-                ffmpeg_archive_url = "https://johnvansickle.com/ffmpeg/releases/ffmpeg-release-amd64-static.tar.xz"
-                ffmpeg_archive_filename = "ffmpeg-release-amd64-static.tar.xz"
-
-            temp_archive_path = os.path.join(self.tools_dir, ffmpeg_archive_filename)
-            temp_extract_dir = os.path.join(self.tools_dir, "ffmpeg_temp_extract")
-
-            if not os.path.exists(ffmpeg_path_in_tools) or not os.path.exists(ffprobe_path_in_tools):
-                self.update_status.emit(f"Downloading {ffmpeg_archive_filename}...")
-                self._download_file(ffmpeg_archive_url, temp_archive_path, "FFmpeg")
-                self.update_status.emit(f"Extracting {ffmpeg_archive_filename}...")
-
-                # Extract to a temporary directory and get the actual root of extracted content
-                extracted_root_dir = self._extract_to_temp_dir(temp_archive_path, temp_extract_dir)
-
-                # Search for ffmpeg and ffprobe within the extracted root dir and its common subfolders
-                search_paths_for_exec = [extracted_root_dir]
-                # Add a 'bin' subfolder to search paths, common for Windows FFmpeg builds
-                search_paths_for_exec.append(os.path.join(extracted_root_dir, "bin"))
-
-                extracted_ffmpeg_path = find_executable(ffmpeg_name, search_paths_for_exec)
-                extracted_ffprobe_path = find_executable(ffprobe_name, search_paths_for_exec)
-
-                if not extracted_ffmpeg_path or not extracted_ffprobe_path:
-                    raise Exception(f"FFmpeg or FFprobe executables not found after extraction in {search_paths_for_exec}. Please check the archive content.")
-
-                # Move ffmpeg/ffprobe to the main tools_dir
-                shutil.move(extracted_ffmpeg_path, ffmpeg_path_in_tools)
-                shutil.move(extracted_ffprobe_path, ffprobe_path_in_tools)
-
-                if sys.platform != "win32": # Set execute permissions for Linux/macOS
-                    os.chmod(ffmpeg_path_in_tools, os.stat(ffmpeg_path_in_tools).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
-                    os.chmod(ffprobe_path_in_tools, os.stat(ffprobe_path_in_tools).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
-
-                self.update_status.emit(f"{ffmpeg_name} and {ffprobe_name} extracted and moved.")
-
-                # Clean up temporary extraction directory and archive
-                if os.path.exists(temp_extract_dir):
-                    shutil.rmtree(temp_extract_dir)
-                    self.update_status.emit(f"Cleaned up temporary extraction directory: {os.path.basename(temp_extract_dir)}.")
-                os.remove(temp_archive_path)
-                self.update_status.emit(f"Cleaned up {ffmpeg_archive_filename}.")
-            else:
-                self.update_status.emit(f"{ffmpeg_name} and {ffprobe_name} already exist.")
+            self._provision_tools()
+
+            # Full verification: every tool must run. Broken ones are removed and fetched again once.
+            self._check_cancelled()
+            manifest, broken = self._verify_tools()
+            if broken:
+                self.update_status.emit(f"Reinstalling tools that failed verification: {', '.join(broken)}")
+                self._provision_tools()
+                self._check_cancelled()
+                manifest, broken = self._verify_tools()
+                if broken:
+                    raise Exception(f"{', '.join(broken)} failed to run after reinstalling.")
+            write_tool_manifest(self.tools_dir, manifest)
+            self.update_status.emit("Tool manifest updated.")
+            self._publish_to_store(manifest)
 
             self.setup_finished.emit(True, "Tool setup completed successfully!")
 
+        except SetupCancelled:
+            pass # The app is closing, nobody waits for the result
         except requests.exceptions.RequestException as e:
             self.setup_finished.emit(False, f"Network error during tool download: {e}")
+        except ChecksumMismatchError as e:
+            self.setup_finished.emit(False, f"Integrity check failed: {e}. The corrupt download was discarded, please retry.")
         except (zipfile.BadZipFile, tarfile.ReadError) as e:
             self.setup_finished.emit(False, f"Archive extraction error: {e}. The downloaded file might be corrupted.")
         except Exception as e:
             self.setup_finished.emit(False, f"An error occurred during tool setup: {e}")
 
-    def _download_file(self, url, destination, tool_name):
-        """Downloads a file with progress updates."""
+    def _provision_tools(self):
+        """Makes sure yt-dlp and FFmpeg are present in tools_dir, downloading what is missing."""
+        # yt-dlp and FFmpeg are independent, so provision them concurrently.
+        # Setup time is then bounded by the slowest tool instead of the sum of both.
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="tool-setup") as executor:
+            futures = [
+                executor.submit(self._setup_yt_dlp),
+                executor.submit(self._setup_ffmpeg),
+            ]
+            for future in as_completed(futures):
+                future.result() # Re-raise any error from the task
+
+    def _verify_tools(self):
+        """
+        Runs and hashes every tool. Returns (manifest, broken): the manifest entries for
+        the tools that work, and the names of tools that didn't (their files are removed).
+        """
+        self.update_status.emit("Verifying tools...")
+        manifest = {}
+        broken = []
+        for name in MANIFEST_TOOLS:
+            path = find_executable(name, [self.tools_dir])
+            if not path and sys.platform != "win32":
+                # The file may exist without its execute bit, e.g. when copied in by hand
+                candidate = os.path.join(self.tools_dir, name)
+                if os.path.isfile(candidate):
+                    os.chmod(candidate, os.stat(candidate).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+                    path = candidate
+            sha256 = _file_sha256(path) if path else None
+            expected = self._store_sources.pop(os.path.basename(path), None) if path else None
+            if expected and sha256 != expected:
+                # The shared store object is corrupt: drop it so the reinstall downloads a fresh copy.
+                # Checked before the tool is run, so a substituted binary never executes.
+                self.update_status.emit(f"{name} from the shared tool store is corrupt, discarding it.")
+                os.remove(path)
+                object_path = _store_object_path(self.store_dir, expected)
+                try:
+                    os.remove(object_path)
+                except OSError:
+                    pass
+                broken.append(name)
+                continue
+            version = _tool_version(path) if path else None
+            if not version:
+                broken.append(name)
+                if path:
+                    os.remove(path)
+                continue
+            manifest[name] = _manifest_entry(path, version, sha256)
+            self.update_status.emit(f"{name}: {version}")
+        return manifest, broken
+
+    def _link_from_store(self, destinations):
+        """
+        Links the tools at 'destinations' (paths inside tools_dir) from the shared store.
+        All or nothing: returns False without touching tools_dir unless every tool is stored.
+        """
+        entries = load_store_index(self.store_dir).get(_store_platform_key(), {})
+        sources = {}
+        for destination in destinations:
+            entry = entries.get(os.path.basename(destination))
+            if not entry:
+                return False
+            object_path = _store_object_path(self.store_dir, entry["sha256"])
+            if not _trusted_store_file(object_path) or os.path.getsize(object_path) != entry["size"]:
+                return False
+            sources[destination] = (object_path, entry)
+        for destination, (object_path, entry) in sources.items():
+            try:
+                method = _link_or_copy(object_path, destination)
+            except OSError as e:
+                self.update_status.emit(f"Could not use the shared tool store ({e}), downloading instead.")
+                return False
+            self._store_sources[os.path.basename(destination)] = entry["sha256"]
+            self.update_status.emit(f"{os.path.basename(destination)} {entry['version']} provided by the shared tool store ({method}).")
+        return True
+
+    def _publish_to_store(self, manifest):
+        """Adds the verified tools to the shared store so other installs on this host can link them.
+        The store is only an optimisation, so failures are reported and otherwise ignored."""
         try:
-            response = requests.get(url, stream=True)
-            response.raise_for_status() # Raise an exception for HTTP errors
+            index = load_store_index(self.store_dir)
+            entries = index.setdefault(_store_platform_key(), {})
+            for entry in manifest.values():
+                object_path = _store_object_path(self.store_dir, entry["sha256"])
+                if not _trusted_store_file(object_path): # Missing, or replaceable by someone else
+                    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                    # 0755 whatever the umask (e.g. 002 on desktops), or the store would distrust its own objects
+                    _link_or_copy(os.path.join(self.tools_dir, entry["file"]), object_path, mode=0o755)
+                entries[entry["file"]] = {"sha256": entry["sha256"], "size": entry["size"], "version": entry["version"]}
+            _write_store_index(self.store_dir, index)
+        except OSError as e:
+            self.update_status.emit(f"Warning: could not update the shared tool store: {e}")
+
+    def _setup_yt_dlp(self):
+        """Downloads yt-dlp if it is not already in the tools directory."""
+        yt_dlp_filename = tool_artifacts("yt-dlp")[0]["filename"]
+        yt_dlp_path = os.path.join(self.tools_dir, yt_dlp_filename)
+
+        if not os.path.exists(yt_dlp_path) and self._link_from_store([yt_dlp_path]):
+            self._report_progress("yt-dlp", 100)
+        elif not os.path.exists(yt_dlp_path):
+            def install(artifact, checksum):
+                self.update_status.emit(f"Downloading {yt_dlp_filename} from {_url_host(artifact['url'])}...")
+                self._download_file(artifact["url"], yt_dlp_path, "yt-dlp", checksum=checksum)
+
+            self._install_from_mirrors("yt-dlp", install)
+            if sys.platform != "win32": # Set execute permissions for Linux/macOS
+                os.chmod(yt_dlp_path, os.stat(yt_dlp_path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+            self.update_status.emit(f"{yt_dlp_filename} downloaded.")
+        else:
+            self._report_progress("yt-dlp", 100)
+            self.update_status.emit(f"{yt_dlp_filename} already exists.")
+
+    def _setup_ffmpeg(self):
+        """Downloads and extracts ffmpeg/ffprobe if they are not already in the tools directory."""
+        ffmpeg_name = "ffmpeg"
+        ffprobe_name = "ffprobe"
+        ffmpeg_path_in_tools = os.path.join(self.tools_dir, ffmpeg_name)
+        ffprobe_path_in_tools = os.path.join(self.tools_dir, ffprobe_name)
+
+        ffmpeg_missing = not os.path.exists(ffmpeg_path_in_tools) or not os.path.exists(ffprobe_path_in_tools)
+        if ffmpeg_missing and self._link_from_store([ffmpeg_path_in_tools, ffprobe_path_in_tools]):
+            self._report_progress("FFmpeg", 100)
+        elif ffmpeg_missing:
+            def install(artifact, checksum):
+                ffmpeg_archive_filename = artifact["filename"]
+                if self.stream_extract and ffmpeg_archive_filename.endswith('.tar.xz'):
+                    # Decompress the archive as it arrives and write only the two binaries,
+                    # so no archive or extraction tree ever touches the disk
+                    self.update_status.emit(f"Downloading and extracting {ffmpeg_archive_filename} from {_url_host(artifact['url'])}...")
+                    try:
+                        self._stream_extract_tar(artifact["url"], "FFmpeg", {
+                            ffmpeg_name: ffmpeg_path_in_tools,
+                            ffprobe_name: ffprobe_path_in_tools,
+                        }, checksum=checksum)
+                        return
+                    except requests.exceptions.RequestException as e:
+                        # A stream can't be resumed, so retry through the resumable archive download
+                        self.update_status.emit(f"Streaming install failed ({e}), falling back to a resumable download...")
+                self._install_ffmpeg_from_archive(artifact["url"], ffmpeg_archive_filename,
+                                                  ffmpeg_path_in_tools, ffprobe_path_in_tools, checksum)
+
+            self._install_from_mirrors("FFmpeg", install)
+
+            if sys.platform != "win32": # Set execute permissions for Linux/macOS
+                os.chmod(ffmpeg_path_in_tools, os.stat(ffmpeg_path_in_tools).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+                os.chmod(ffprobe_path_in_tools, os.stat(ffprobe_path_in_tools).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+            self.update_status.emit(f"{ffmpeg_name} and {ffprobe_name} installed.")
+        else:
+            self._report_progress("FFmpeg", 100)
+            self.update_status.emit(f"{ffmpeg_name} and {ffprobe_name} already exist.")
+
+    def _install_from_mirrors(self, tool_name, install):
+        """
+        Calls install(artifact, checksum) for the tool's artifacts, best mirror first, until
+        one succeeds.
+        """
+        last_error = None
+        for artifact in self._rank_artifacts(tool_name):
+            checksum = None
+            if artifact["checksum"]:
+                algorithm, checksum_url = artifact["checksum"]
+                checksum = self._fetch_checksum(checksum_url, algorithm, artifact["filename"], tool_name)
+            try:
+                install(artifact, checksum)
+                return
+            except (requests.exceptions.RequestException, ChecksumMismatchError) as e:
+                last_error = e
+                self.update_status.emit(f"{tool_name} from {_url_host(artifact['url'])} failed ({e}), trying the next mirror...")
+        raise last_error
+
+    def _rank_artifacts(self, tool_name):
+        """
+        Orders the tool's artifacts: reachable mirrors first, then the fastest recorded
+        throughput, then the lowest latency measured by a concurrent probe.
+        """
+        artifacts = tool_artifacts(tool_name)
+        if len(artifacts) == 1:
+            return list(artifacts) # Nothing to choose between, skip the probe
+
+        latencies = self._probe_mirrors([artifact["url"] for artifact in artifacts])
+        history = load_mirror_history(self.tools_dir)
+
+        def rank(artifact):
+            latency = latencies.get(artifact["url"])
+            speed = history.get(artifact["url"], {}).get("bytes_per_sec", 0)
+            return (latency is None, -speed, latency if latency is not None else float("inf"))
+
+        ranked = sorted(artifacts, key=rank)
+        self.update_status.emit(f"{tool_name} mirror order: {', '.join(_url_host(artifact['url']) for artifact in ranked)}")
+        return ranked
+
+    def _probe_mirrors(self, urls):
+        """Sends a HEAD request to every mirror at once. Returns {url: seconds} for the ones that answered."""
+        def probe(url):
+            started = time.monotonic()
+            response = self.session.head(url, allow_redirects=True, timeout=self.probe_timeout)
+            response.raise_for_status()
+            return time.monotonic() - started
+
+        latencies = {}
+        with ThreadPoolExecutor(max_workers=len(urls), thread_name_prefix="mirror-probe") as executor:
+            futures = {executor.submit(probe, url): url for url in urls}
+            for future in as_completed(futures):
+                try:
+                    latencies[futures[future]] = future.result()
+                except requests.exceptions.RequestException:
+                    pass # Unreachable mirrors are ranked last
+        return latencies
+
+    def _record_speed(self, url, size, seconds):
+        # Tiny transfers measure latency rather than throughput, so they are not recorded
+        if size >= 256 * 1024 and seconds > 0:
+            record_mirror_speed(self.tools_dir, url, size / seconds)
+
+    def _install_ffmpeg_from_archive(self, ffmpeg_archive_url, ffmpeg_archive_filename, ffmpeg_path_in_tools, ffprobe_path_in_tools, checksum=None):
+        """Downloads the FFmpeg archive to disk, extracts it and moves ffmpeg/ffprobe into tools_dir."""
+        temp_archive_path = os.path.join(self.tools_dir, ffmpeg_archive_filename)
+        temp_extract_dir = os.path.join(self.tools_dir, "ffmpeg_temp_extract")
+
+        self.update_status.emit(f"Downloading {ffmpeg_archive_filename} from {_url_host(ffmpeg_archive_url)}...")
+        self._download_file(ffmpeg_archive_url, temp_archive_path, "FFmpeg", segments=self.download_segments,
+                            checksum=checksum)
+        self.update_status.emit(f"Extracting {ffmpeg_archive_filename}...")
+
+        # Extract to a temporary directory and get the actual root of extracted content
+        extracted_root_dir = self._extract_to_temp_dir(temp_archive_path, temp_extract_dir)
+
+        # Search for ffmpeg and ffprobe within the extracted root dir and its common subfolders
+        search_paths_for_exec = [extracted_root_dir]
+        # Add a 'bin' subfolder to search paths, common for Windows FFmpeg builds
+        search_paths_for_exec.append(os.path.join(extracted_root_dir, "bin"))
+
+        extracted_ffmpeg_path = find_executable("ffmpeg", search_paths_for_exec)
+        extracted_ffprobe_path = find_executable("ffprobe", search_paths_for_exec)
+
+        if not extracted_ffmpeg_path or not extracted_ffprobe_path:
+            raise Exception(f"FFmpeg or FFprobe executables not found after extraction in {search_paths_for_exec}. Please check the archive content.")
+
+        # Move ffmpeg/ffprobe to the main tools_dir
+        shutil.move(extracted_ffmpeg_path, ffmpeg_path_in_tools)
+        shutil.move(extracted_ffprobe_path, ffprobe_path_in_tools)
+
+        # Clean up temporary extraction directory and archive
+        if os.path.exists(temp_extract_dir):
+            shutil.rmtree(temp_extract_dir)
+            self.update_status.emit(f"Cleaned up temporary extraction directory: {os.path.basename(temp_extract_dir)}.")
+        os.remove(temp_archive_path)
+        self.update_status.emit(f"Cleaned up {ffmpeg_archive_filename}.")
+
+    def _stream_extract_tar(self, url, tool_name, member_targets, checksum=None):
+        """Streams a .tar.xz from 'url' through the decompressor and writes only the members
+        named in 'member_targets' (file name -> final path). The transfer stops as soon as
+        all of them have been written, unless a checksum needs the rest of the archive."""
+        part_paths = {name: path + ".part" for name, path in member_targets.items()}
+        digest = _StreamingDigest(checksum[0]) if checksum else None
+        written = set()
+        try:
+            with self.session.get(url, stream=True, timeout=self.request_timeout) as response:
+                response.raise_for_status()
+                total_size = int(response.headers.get('content-length', 0))
+
+                def on_read(downloaded_size):
+                    if total_size > 0:
+                        self._report_progress(tool_name, int(downloaded_size * 100 / total_size))
+
+                reader = _ProgressReader(response.raw, on_read, digest)
+                started = time.monotonic()
+                decoder = _xz_decoder() if self.parallel_decompression else None
+                if decoder:
+                    # The checksum covers the whole archive, so with one the feeder reads to the end
+                    stream = _ExternalXzStream(decoder[1], reader, drain_source=bool(digest))
+                    try:
+                        with tarfile.open(fileobj=stream.stdout, mode='r|') as tar_ref:
+                            self._write_tar_members(tar_ref, part_paths, written)
+                    finally:
+                        stream.close()
+                else:
+                    with tarfile.open(fileobj=reader, mode='r|xz') as tar_ref:
+                        self._write_tar_members(tar_ref, part_paths, written)
+                    if digest:
+                        # The checksum covers the whole archive, so hash the remaining bytes without unpacking them
+                        while reader.read(1024 * 1024):
+                            pass
+                self.update_status.emit(f"{tool_name} downloaded and decompressed with {_xz_backend_name(decoder)} "
+                                        f"in {time.monotonic() - started:.1f} s.")
+
+            missing = set(part_paths) - written
+            if missing:
+                raise Exception(f"{', '.join(sorted(missing))} not found in the archive from {url}.")
+            if digest:
+                self._check_digest(digest, checksum, tool_name)
+            self._record_speed(url, reader.bytes_read, time.monotonic() - started)
+            for name, part_path in part_paths.items():
+                os.replace(part_path, member_targets[name])
+            save_validators(self.tools_dir, url, response.headers)
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+            raise requests.exceptions.RequestException(f"Failed to download {tool_name} from {url}: {e}")
+        finally:
+            for part_path in part_paths.values():
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+        self._report_progress(tool_name, 100)
 
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded_size = 0
+    def _revalidate(self, url):
+        """
+        Asks the server whether 'url' changed since it was last downloaded, using the stored
+        ETag / Last-Modified. Returns (unchanged, headers): unchanged is True only for a 304,
+        which costs a single round trip and no body.
+        """
+        headers = _conditional_headers(load_validators(self.tools_dir, url))
+        response = self.session.head(url, headers=headers, allow_redirects=True, timeout=self.request_timeout)
+        if response.status_code == 304:
+            return True, response.headers
+        response.raise_for_status()
+        return False, response.headers
+
+    def _write_tar_members(self, tar_ref, part_paths, written):
+        """Writes the wanted members of a stream-mode tar to their part paths, stopping as soon
+        as all of them are written. Names are added to 'written' as they complete."""
+        for member in tar_ref:
+            name = _executable_member_name(member.name)
+            if not member.isfile() or name not in part_paths or name in written:
+                continue
+            with tar_ref.extractfile(member) as source, open(part_paths[name], 'wb') as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+            written.add(name)
+            if len(written) == len(part_paths):
+                return # Everything after the binaries (docs, manpages, models) is never unpacked
+
+    def _report_progress(self, tool_name, progress):
+        """Records one tool's progress and emits the combined progress of all tools.
+        The bar shows the average, the text shows each tool separately."""
+        self._check_cancelled() # Called for every chunk, so a cancelled download stops within one read
+        with self._progress_lock:
+            self._tool_progress[tool_name] = progress
+            overall = sum(self._tool_progress.values()) // len(self._tool_progress)
+            text = " | ".join(f"{name}: {value}%" for name, value in self._tool_progress.items())
+            # Coalesce: each signal is a cross-thread event for the GUI, so only emit when the
+            # displayed value changed, and at most every progress_interval unless a tool finished
+            last_text, last_time = self._last_progress_emit
+            now = time.monotonic()
+            if text == last_text or (progress < 100 and now - last_time < self.progress_interval):
+                return
+            self._last_progress_emit = (text, now)
+        self.update_progress_bar.emit(overall, text)
+
+    def _download_file(self, url, destination, tool_name, segments=1, checksum=None):
+        """Downloads a file with progress updates.
+        Data goes to '<destination>.part' and is resumed with HTTP Range requests after an
+        interruption (or on the next run); the file is renamed into place only once complete.
+        With segments > 1 the file is fetched over several parallel range connections when
+        the server supports it. 'checksum' is an (algorithm, hex digest) pair that the data,
+        hashed as it streams in, must match before the rename."""
+        part_path = destination + ".part"
+        digest = _StreamingDigest(checksum[0]) if checksum else None
+        # A single-stream partial file from an earlier run is cheaper to resume than to refetch
+        if segments > 1 and not os.path.exists(part_path):
+            try:
+                if self._download_segmented(url, destination, tool_name, segments, checksum):
+                    self._report_progress(tool_name, 100)
+                    return
+            except requests.exceptions.RequestException as e:
+                # Keep what the segments fetched and carry on over a single resumable stream
+                kept = self._segments_to_part(destination, part_path)
+                self.update_status.emit(f"Segmented {tool_name} download failed ({e}), continuing over one connection from byte {kept}...")
+
+        attempts = 0
+        while True:
+            size_before = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            try:
+                self._download_to_part(url, part_path, tool_name, digest)
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.Timeout, IncompleteDownloadError) as e:
+                # Only give up after several attempts in a row that made no progress at all
+                size_after = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                attempts = 1 if size_after > size_before else attempts + 1
+                if attempts > self.max_resume_attempts:
+                    raise requests.exceptions.RequestException(f"Failed to download {tool_name} from {url} after {attempts} attempts: {e}")
+                self.update_status.emit(f"{tool_name} download interrupted at {size_after} bytes, resuming...")
+                time.sleep(self.resume_delay * attempts)
+            except requests.exceptions.RequestException as e:
+                raise requests.exceptions.RequestException(f"Failed to download {tool_name} from {url}: {e}")
+
+        if digest:
+            digest.catch_up(part_path, os.path.getsize(part_path))
+            try:
+                self._check_digest(digest, checksum, tool_name)
+            except ChecksumMismatchError:
+                os.remove(part_path) # Don't resume from corrupt data next time
+                raise
+        os.replace(part_path, destination) # Atomic, so a truncated file is never seen as installed
+        self._report_progress(tool_name, 100)
+
+    def _fetch_checksum(self, checksum_url, algorithm, filename, tool_name):
+        """Downloads the publisher's checksum file and returns (algorithm, hex digest) for
+        'filename', or None (with a warning) if no checksum is available."""
+        try:
+            response = self.session.get(checksum_url, timeout=self.request_timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            self.update_status.emit(f"Warning: could not fetch the {tool_name} checksum ({e}), skipping verification.")
+            return None
+        expected = _parse_checksum_file(response.text, filename)
+        if not expected:
+            self.update_status.emit(f"Warning: no checksum for {filename} in {checksum_url}, skipping verification.")
+            return None
+        return (algorithm, expected)
+
+    def _check_digest(self, digest, checksum, tool_name):
+        """Raises ChecksumMismatchError unless the digest matches the expected checksum."""
+        algorithm, expected = checksum
+        actual = digest.hexdigest(algorithm)
+        if actual != expected:
+            raise ChecksumMismatchError(f"{tool_name} {algorithm} is {actual}, expected {expected}")
+        self.update_status.emit(f"{tool_name} checksum verified (sha256 {digest.hexdigest('sha256')}).")
+
+    def _download_to_part(self, url, part_path, tool_name, digest=None):
+        """Fetches the rest of 'url' into 'part_path', continuing from its current size.
+        Raises IncompleteDownloadError if the connection ends before the whole file arrived."""
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            # If the file changed since the partial download started, If-Range makes the
+            # server send the whole new file (200) instead of splicing two versions together
+            validators = load_validators(self.tools_dir, url)
+            if validators.get("etag") or validators.get("last_modified"):
+                headers["If-Range"] = validators.get("etag") or validators["last_modified"]
+
+        with self.session.get(url, stream=True, headers=headers, timeout=self.request_timeout) as response:
+            if offset and response.status_code == 416:
+                # Range starts past the end: either the part file is already complete or it is stale
+                if _content_range_total(response.headers.get("content-range")) == offset:
+                    return
+                os.remove(part_path)
+                raise IncompleteDownloadError("Partial file does not match the remote file, restarting")
+            response.raise_for_status() # Raise an exception for HTTP errors
 
-            with open(destination, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
+            if offset and response.status_code == 206:
+                total_size = _content_range_total(response.headers.get("content-range")) or 0
+                mode = 'ab'
+            else:
+                # No partial file yet, or the server ignored the Range header: start from byte 0
+                offset = 0
+                total_size = int(response.headers.get('content-length', 0))
+                mode = 'wb'
+                save_validators(self.tools_dir, url, response.headers)
+            downloaded_size = offset
+            if digest:
+                digest.catch_up(part_path, offset) # Free within a run; re-reads the prefix after a restart
+
+            started = time.monotonic()
+            try:
+                with open(part_path, mode) as f:
+                    for chunk in _iter_raw_chunks(response, bytearray(self.download_chunk_size)):
                         f.write(chunk)
+                        if digest:
+                            digest.update(chunk)
                         downloaded_size += len(chunk)
                         if total_size > 0:
-                            progress = int(downloaded_size * 100 / total_size)
-                            self.update_progress_bar.emit(progress, f"Downloading {tool_name}: {progress}%")
-            self.update_progress_bar.emit(100, f"Downloading {tool_name}: 100%")
+                            self._report_progress(tool_name, int(downloaded_size * 100 / total_size))
+            finally:
+                self._record_speed(url, downloaded_size - offset, time.monotonic() - started)
+
+        if total_size > 0 and downloaded_size < total_size:
+            raise IncompleteDownloadError(f"Received {downloaded_size} of {total_size} bytes")
+
+    def _download_segmented(self, url, destination, tool_name, segments, checksum=None):
+        """Fetches 'url' as 'segments' parallel byte ranges written into a preallocated file.
+        Returns False without downloading anything if the server does not support ranges
+        or the file is too small to be worth splitting. Segments arrive out of order, so the
+        checksum is computed once at the end, while the file is still in the page cache.
+        Each segment's position is saved to '<destination>.segments.json', so a failed or
+        interrupted download keeps its data and the next attempt continues every range."""
+        try:
+            # Probe with a one-byte range: a 206 answer proves range support and gives the size.
+            # The final URL is reused so the segments don't each follow the redirect chain.
+            with self.session.get(url, stream=True, headers={"Range": "bytes=0-0"}, timeout=self.request_timeout) as probe:
+                probe.raise_for_status()
+                total_size = _content_range_total(probe.headers.get("content-range")) if probe.status_code == 206 else None
+                final_url = probe.url
+                probe_headers = probe.headers
         except requests.exceptions.RequestException as e:
             raise requests.exceptions.RequestException(f"Failed to download {tool_name} from {url}: {e}")
 
-    def _extract_to_temp_dir(self, archive_path, temp_extract_path):
-        """Extracts a zip or tar.xz archive to a temporary directory.
+        if not total_size or total_size < 2 * self.min_segment_size:
+            return False
+
+        segmented_path = destination + ".segments"
+        state_path = segmented_path + ".json"
+        # Saved data is only reused for the same remote file: same size and validators
+        remote = {"size": total_size, "etag": probe_headers.get("etag"), "last_modified": probe_headers.get("last-modified")}
+        state = _load_json(state_path) if os.path.exists(segmented_path) else None
+        if state and state.get("remote") == remote and state.get("segments"):
+            ranges = state["segments"] # [start, position, end] per segment; position is the next byte to fetch
+            resumed = sum(position - start for start, position, _ in ranges)
+            self.update_status.emit(f"Resuming {tool_name} over {len(ranges)} connections at {resumed} of {total_size} bytes...")
+        else:
+            segments = min(segments, total_size // self.min_segment_size)
+            segment_size = total_size // segments
+            ranges = [[i * segment_size, i * segment_size, total_size - 1 if i == segments - 1 else (i + 1) * segment_size - 1]
+                      for i in range(segments)]
+            resumed = 0
+            self.update_status.emit(f"Downloading {tool_name} over {segments} connections...")
+
+        progress = {"downloaded": resumed, "saved": time.monotonic()}
+        progress_lock = threading.Lock()
+
+        def save_state():
+            _write_json_atomic(state_path, {"remote": remote, "segments": ranges})
+
+        def on_chunk(index, size, position):
+            with progress_lock:
+                ranges[index][1] = position
+                progress["downloaded"] += size
+                downloaded = progress["downloaded"]
+                # Positions are recorded only after their bytes were written, so a saved state never overstates the data
+                if time.monotonic() - progress["saved"] >= 1.0:
+                    save_state()
+                    progress["saved"] = time.monotonic()
+            self._report_progress(tool_name, int(downloaded * 100 / total_size))
+
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        if not resumed:
+            flags |= os.O_TRUNC
+        fd = os.open(segmented_path, flags)
+        started = time.monotonic()
+        completed = corrupt = False
+        try:
+            os.ftruncate(fd, total_size) # Preallocate so every segment can write at its own offset
+            save_state()
+            with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix=f"{tool_name}-segment") as executor:
+                futures = [executor.submit(self._download_segment, final_url, fd, position, end,
+                                           functools.partial(on_chunk, index))
+                           for index, (_, position, end) in enumerate(ranges) if position <= end]
+                for future in as_completed(futures):
+                    future.result()
+            if checksum:
+                digest = _StreamingDigest(checksum[0])
+                digest.catch_up(segmented_path, total_size)
+                try:
+                    self._check_digest(digest, checksum, tool_name)
+                except ChecksumMismatchError:
+                    corrupt = True # Don't resume from corrupt data next time
+                    raise
+            completed = True
+        except requests.exceptions.RequestException as e:
+            raise requests.exceptions.RequestException(f"Failed to download {tool_name} from {url}: {e}")
+        finally:
+            os.close(fd)
+            if completed or corrupt:
+                os.remove(state_path)
+                if corrupt:
+                    os.remove(segmented_path)
+            else:
+                save_state()
+
+        self._record_speed(url, total_size - resumed, time.monotonic() - started)
+        os.replace(segmented_path, destination)
+        save_validators(self.tools_dir, url, probe_headers)
+        return True
+
+    def _segments_to_part(self, destination, part_path):
+        """Turns an unfinished segmented download into a single-stream part file holding its
+        longest complete prefix, which _download_to_part can resume. Returns the prefix size."""
+        segmented_path = destination + ".segments"
+        state_path = segmented_path + ".json"
+        state = _load_json(state_path) or {}
+        prefix = 0
+        for start, position, end in sorted(state.get("segments") or []):
+            if start != prefix:
+                break
+            prefix = position
+            if position <= end:
+                break # This segment is still incomplete, so the prefix ends here
+        if os.path.exists(segmented_path):
+            with open(segmented_path, 'r+b') as f:
+                f.truncate(prefix)
+            os.replace(segmented_path, part_path)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        return prefix
+
+    def _download_segment(self, url, fd, position, end, on_chunk):
+        """Downloads bytes position..end (inclusive) of 'url' into 'fd' at the same offsets,
+        retrying from the last received byte when the connection drops.
+        on_chunk(size, position) is called after every write."""
+        attempts = 0
+        buffer = bytearray(self.download_chunk_size) # One buffer per segment thread, reused for every read
+        while position <= end:
+            position_before = position
+            try:
+                headers = {"Range": f"bytes={position}-{end}"}
+                with self.session.get(url, stream=True, headers=headers, timeout=self.request_timeout) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        raise IncompleteDownloadError("Server stopped honouring range requests")
+                    for chunk in _iter_raw_chunks(response, buffer):
+                        chunk = chunk[:end + 1 - position] # Never write past this segment
+                        _pwrite(fd, chunk, position)
+                        position += len(chunk)
+                        on_chunk(len(chunk), position)
+                if position <= end:
+                    raise IncompleteDownloadError(f"Segment ended at byte {position} of {end}")
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.Timeout, IncompleteDownloadError):
+                attempts = 1 if position > position_before else attempts + 1
+                if attempts > self.max_resume_attempts:
+                    raise
+                time.sleep(self.resume_delay * attempts)
+
+    def _extract_to_temp_dir(self, archive_path, temp_extract_path, member_names=("ffmpeg", "ffprobe")):
+        """Extracts only the executables named in 'member_names' from a zip or tar.xz archive
+        to a temporary directory, keeping their paths inside the archive.
         Returns the path to the actual root directory of the extracted content."""
         if os.path.exists(temp_extract_path):
             shutil.rmtree(temp_extract_path) # Clean up previous temp extraction
         os.makedirs(temp_extract_path)
 
+        wanted = set(member_names)
+        found = set()
+        started = time.monotonic()
         if archive_path.endswith('.zip'):
             with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_extract_path)
+                # The central directory lists every entry up front, so nothing else is decompressed
+                members = {}
+                for member in zip_ref.infolist():
+                    name = _executable_member_name(member.filename)
+                    if not member.is_dir() and name in wanted and name not in members:
+                        members[name] = member
+
+            def extract_member(member):
+                # One ZipFile per thread: zlib releases the GIL, so the members inflate in parallel
+                with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+                    extracted_path = zip_ref.extract(member, temp_extract_path)
+                if sys.platform != "win32": # Zip entries don't carry the execute bit through extract()
+                    os.chmod(extracted_path, os.stat(extracted_path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+            workers = len(members) if self.parallel_decompression else 1
+            with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="unzip") as executor:
+                list(executor.map(extract_member, members.values()))
+            backend = f"zipfile ({workers} members in parallel)" if workers > 1 else "zipfile"
         elif archive_path.endswith('.tar.xz'):
-            with tarfile.open(archive_path, 'r:xz') as tar_ref:
-                tar_ref.extractall(temp_extract_path)
+            decoder = _xz_decoder() if self.parallel_decompression else None
+            backend = _xz_backend_name(decoder)
+            with open(archive_path, 'rb') as archive:
+                stream = _ExternalXzStream(decoder[1], archive) if decoder else None
+                try:
+                    with tarfile.open(fileobj=stream.stdout, mode='r|') if stream else tarfile.open(fileobj=archive, mode='r:xz') as tar_ref:
+                        # A tar has no index, so walk it only until both binaries have been seen
+                        for member in tar_ref:
+                            name = _executable_member_name(member.name)
+                            if not member.isfile() or name not in wanted or name in found:
+                                continue
+                            tar_ref.extract(member, temp_extract_path)
+                            found.add(name)
+                            if found == wanted:
+                                break
+                finally:
+                    if stream:
+                        stream.close()
         else:
             raise ValueError("Unsupported archive format. Only .zip and .tar.xz are supported.")
+        self.update_status.emit(f"Extracted {os.path.basename(archive_path)} with {backend} in {time.monotonic() - started:.1f} s.")
 
         # Find the actual root directory inside the extracted path
         # This handles cases where extraction creates a single top-level folder
@@ -186,54 +1403,1019 @@ class SetupWorker(QThread):
         return temp_extract_path # Otherwise, executables are directly in temp_extract_path
 
 
+# --- Worker Thread for Updating yt-dlp in the Background ---
+class YtDlpUpdateWorker(SetupWorker):
+    """
+    Checks for a newer yt-dlp release while the app is already usable, and stages it next to
+    the installed binary. The app swaps the staged file in between jobs (see update_ready).
+    """
+    update_ready = pyqtSignal(str, object) # staged path, {"entry": manifest entry, "url"/"headers": validators}
+
+    latest_release_api = "https://api.github.com/repos/yt-dlp/yt-dlp/releases/latest"
+    latest_download_url = "https://github.com/yt-dlp/yt-dlp/releases/latest/download/{filename}"
+    release_download_url = "https://github.com/yt-dlp/yt-dlp/releases/download/{tag}/{filename}"
+
+    def run(self):
+        try:
+            manifest = load_tool_manifest(self.tools_dir) or {}
+            current = manifest.get("yt-dlp")
+            if not current:
+                return # Nothing verified to compare against; SetupWorker handles fresh installs
+
+            self._check_ffmpeg_build()
+            self._check_cancelled()
+
+            # Cheap path: a 304 on the "latest" URL means the installed build is still current
+            latest_url = self.latest_download_url.format(filename=current["file"])
+            unchanged, latest_headers = self._revalidate(latest_url)
+            if unchanged:
+                self.update_status.emit(f"yt-dlp {current['version']} is up to date (not modified).")
+                return
+
+            self._check_cancelled()
+            response = self.session.get(self.latest_release_api, timeout=self.request_timeout)
+            response.raise_for_status()
+            latest_version = response.json()["tag_name"]
+            # yt-dlp versions are dates (YYYY.MM.DD[.build]), so string order is release order
+            if latest_version <= current["version"]:
+                # Remember the validators, so the next check is a single 304
+                save_validators(self.tools_dir, latest_url, latest_headers)
+                self.update_status.emit(f"yt-dlp {current['version']} is up to date.")
+                return
+
+            self._check_cancelled()
+            self.update_status.emit(f"Downloading yt-dlp {latest_version} in the background...")
+            filename = current["file"]
+            staged_path = os.path.join(self.tools_dir, "yt-dlp-update.exe" if sys.platform == "win32" else "yt-dlp-update")
+            # Pin both URLs to the tag, so the binary and its checksum always come from the same release
+            checksum = self._fetch_checksum(self.release_download_url.format(tag=latest_version, filename="SHA2-256SUMS"),
+                                            "sha256", filename, "yt-dlp")
+            self._download_file(self.release_download_url.format(tag=latest_version, filename=filename),
+                                staged_path, "yt-dlp", checksum=checksum)
+            if sys.platform != "win32": # Set execute permissions for Linux/macOS
+                os.chmod(staged_path, os.stat(staged_path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+            self._check_cancelled()
+            version = _tool_version(staged_path)
+            if not version:
+                os.remove(staged_path)
+                raise Exception(f"the downloaded yt-dlp {latest_version} does not run")
+            entry = _manifest_entry(staged_path, version, _file_sha256(staged_path))
+            entry["file"] = filename # The rename into place keeps size and mtime, so the entry stays valid
+            # Saved by the app only once the swap happened, so an update lost before the swap is retried
+            self.update_ready.emit(staged_path, {"entry": entry, "url": latest_url, "headers": dict(latest_headers)})
+        except SetupCancelled:
+            pass
+        except (requests.exceptions.RequestException, ChecksumMismatchError, ValueError, KeyError) as e:
+            self.update_status.emit(f"yt-dlp update check failed: {e}")
+        except Exception as e:
+            self.update_status.emit(f"yt-dlp update failed: {e}")
+
+    def _check_ffmpeg_build(self):
+        """Revalidates the FFmpeg archive URL and reports when a newer build is published.
+        FFmpeg is not hot-swapped, this only tells the user."""
+        for artifact in tool_artifacts("FFmpeg"):
+            ffmpeg_archive_url = artifact["url"]
+            if not load_validators(self.tools_dir, ffmpeg_archive_url):
+                continue # Not the installed build, or installed before validators were recorded
+            try:
+                unchanged, _ = self._revalidate(ffmpeg_archive_url)
+            except requests.exceptions.RequestException as e:
+                self.update_status.emit(f"FFmpeg update check failed: {e}")
+                return
+            if not unchanged:
+                self.update_status.emit(f"A newer FFmpeg build is available at {ffmpeg_archive_url}.")
+            return
+
+
+# --- Download progress ---
+PROGRESS_MARKER = "[ytd-progress] "
+PROGRESS_FIELDS = ("status", "downloaded_bytes", "total_bytes", "total_bytes_estimate",
+                   "speed", "eta", "fragment_index", "fragment_count")
+# One JSON object per progress update; %(...)j encodes each field (missing ones become null)
+PROGRESS_TEMPLATE = "download:" + PROGRESS_MARKER + "{" + ",".join(
+    f'"{field}":%(progress.{field})j' for field in PROGRESS_FIELDS) + ',"url":%(info.original_url)j}'
+PROGRESS_INTERVAL = 0.25 # Seconds between progress updates from any engine
+# aria2c's own status line, e.g. "[#2089b0 12MiB/80MiB(15%) CN:16 DL:3.1MiB ETA:21s]"
+_ARIA2C_PROGRESS = re.compile(
+    r"\[#\w+ (?P<done>[\d.]+)(?P<done_unit>[KMGT]?i?B)/(?P<total>[\d.]+)(?P<total_unit>[KMGT]?i?B)\(\d+%\)"
+    r"(?: CN:\d+)?(?: SD:\d+)?(?: DL:(?P<speed>[\d.]+)(?P<speed_unit>[KMGT]?i?B))?(?: ETA:(?P<eta>[\dhms]+))?\]")
+_NA_PLACEHOLDER = re.compile(r":NA(?=[,}])")
+_SIZE_UNITS = {"B": 1, "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3, "TiB": 1024 ** 4}
+
+
+def _aria2c_seconds(eta):
+    seconds = 0
+    for value, unit in re.findall(r"(\d+)([hms])", eta):
+        seconds += int(value) * {"h": 3600, "m": 60, "s": 1}[unit]
+    return seconds
+
+
+def parse_progress_line(line):
+    """
+    Returns the progress fields carried by a PROGRESS_TEMPLATE line or an aria2c status
+    line as a dict (see PROGRESS_FIELDS, plus "url" for template lines), or None for any
+    other output.
+    """
+    if line.startswith(PROGRESS_MARKER):
+        try:
+            # Missing fields are printed as yt-dlp's bare NA placeholder rather than JSON null
+            return json.loads(_NA_PLACEHOLDER.sub(":null", line[len(PROGRESS_MARKER):]))
+        except ValueError:
+            return None
+    if line.startswith("[#"):
+        match = _ARIA2C_PROGRESS.match(line)
+        if match:
+            return {
+                "status": "downloading",
+                "downloaded_bytes": int(float(match["done"]) * _SIZE_UNITS.get(match["done_unit"], 1)),
+                "total_bytes": int(float(match["total"]) * _SIZE_UNITS.get(match["total_unit"], 1)),
+                "speed": float(match["speed"]) * _SIZE_UNITS.get(match["speed_unit"], 1) if match["speed"] else None,
+                "eta": _aria2c_seconds(match["eta"]) if match["eta"] else None,
+            }
+    return None
+
+
+def progress_from_hook(status):
+    """Picks the PROGRESS_FIELDS out of a yt-dlp progress hook dict."""
+    fields = {field: status.get(field) for field in PROGRESS_FIELDS}
+    fields["url"] = (status.get("info_dict") or {}).get("original_url")
+    return fields
+
+
+def format_bytes(size):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+# --- Transfer engine ---
+NATIVE_CONCURRENT_FRAGMENTS = 8 # Fragments yt-dlp's own downloader fetches at once when aria2c is missing
+ARIA2C_ARGS = "-x 16 -s 16 -k 1M"
+
+
+@functools.lru_cache(maxsize=None)
+def probe_aria2c(tools_dir):
+    """
+    Looks for aria2c in tools_dir and on PATH once per process. Returns (path, version), or
+    None when it is missing or does not run.
+    """
+    path = find_executable("aria2c", [tools_dir]) or shutil.which("aria2c")
+    if not path:
+        return None
+    try:
+        output = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r"aria2 version (\S+)", output)
+    return (path, match.group(1) if match else "unknown version")
+
+
+def transfer_args(aria2c):
+    """yt-dlp options selecting aria2c when the probe found it, else the native downloader with parallel fragments."""
+    if aria2c:
+        return ["--external-downloader", aria2c[0], "--external-downloader-args", f"aria2c:{ARIA2C_ARGS}"]
+    return ["--concurrent-fragments", str(NATIVE_CONCURRENT_FRAGMENTS)]
+
+
+def describe_transfer(aria2c, aria2_rpc=None):
+    if aria2c and aria2_rpc:
+        return f"shared aria2c {aria2c[1]} RPC daemon (native downloader for fragmented formats)"
+    if aria2c:
+        return f"aria2c {aria2c[1]} ({ARIA2C_ARGS})"
+    return f"yt-dlp native downloader ({NATIVE_CONCURRENT_FRAGMENTS} concurrent fragments)"
+
+
+# --- aria2c tuning ---
+# Smoothed throughput per media host and connection count, so the next file from a host
+# starts at the connection count that was fastest there instead of a fixed -x 16 -s 16 -k 1M
+ARIA2_TUNING_FILENAME = "aria2_tuning.json"
+ARIA2_CONNECTION_LEVELS = (2, 4, 8, 16) # aria2c caps --max-connection-per-server at 16
+ARIA2_MIN_PIECE = 1024 * 1024 # aria2c's smallest --min-split-size
+ARIA2_MAX_PIECE = 32 * 1024 * 1024
+ARIA2_MIN_SAMPLE_BYTES = 4 * 1024 * 1024 # Smaller files finish before extra connections pay off; their speed says little
+ARIA2_MIN_SAMPLE_SECONDS = 2.0 # Active time is measured between polls, so shorter samples are mostly rounding
+_aria2_tuning_lock = threading.Lock()
+
+
+def _tuning_host(url):
+    """Groups CDN edge hosts (rr3---sn-abc.googlevideo.com) under their domain, which is what the learned values describe."""
+    host = (urllib.parse.urlsplit(url).hostname or "").lower()
+    if re.fullmatch(r"[\d.]+|.*:.*", host):
+        return host
+    return ".".join(host.split(".")[-2:])
+
+
+def _pick_connections(levels):
+    """
+    Hill-climbs over ARIA2_CONNECTION_LEVELS: starts at the top level, tries the untried
+    neighbours of the fastest level seen, and settles on the fastest once both were measured.
+    The moving averages keep moving, so a host whose optimum shifts pulls the choice along.
+    """
+    measured = {int(level): entry["bytes_per_sec"] for level, entry in levels.items()
+                if int(level) in ARIA2_CONNECTION_LEVELS}
+    if not measured:
+        return ARIA2_CONNECTION_LEVELS[-1]
+    best = max(measured, key=measured.get)
+    index = ARIA2_CONNECTION_LEVELS.index(best)
+    for neighbour in (index - 1, index + 1):
+        if 0 <= neighbour < len(ARIA2_CONNECTION_LEVELS) and ARIA2_CONNECTION_LEVELS[neighbour] not in measured:
+            return ARIA2_CONNECTION_LEVELS[neighbour]
+    return best
+
+
+def aria2_options_for(tuning_dir, url, size):
+    """
+    aria2c split/connection options for one file: the host's learned connection count, cut
+    down so no piece is smaller than ARIA2_MIN_PIECE, and pieces that grow with the file so a
+    4 GB video isn't cut into 1 MiB requests. size may be None when yt-dlp doesn't know it.
+    """
+    levels = {}
+    if tuning_dir:
+        levels = (_load_json(os.path.join(tuning_dir, ARIA2_TUNING_FILENAME)) or {}).get(_tuning_host(url), {})
+    connections = _pick_connections(levels)
+    piece = ARIA2_MIN_PIECE
+    if size:
+        # Round down to a level, so the file's throughput is still recorded for one
+        cap = min(connections, size // ARIA2_MIN_PIECE)
+        connections = max((level for level in ARIA2_CONNECTION_LEVELS if level <= cap), default=1)
+        # Two pieces per connection leaves aria2c room to rebalance when one connection stalls
+        piece = min(ARIA2_MAX_PIECE, max(ARIA2_MIN_PIECE, size // (connections * 2)))
+    return {
+        "max-connection-per-server": str(connections),
+        "split": str(connections),
+        "min-split-size": f"{piece // 1024}K",
+    }
+
+
+def record_aria2_result(tuning_dir, url, connections, size, seconds):
+    """Folds the bytes a file received over the seconds it was active into the host's moving
+    average for that connection count."""
+    if (not tuning_dir or size < ARIA2_MIN_SAMPLE_BYTES or seconds < ARIA2_MIN_SAMPLE_SECONDS
+            or connections not in ARIA2_CONNECTION_LEVELS):
+        return
+    path = os.path.join(tuning_dir, ARIA2_TUNING_FILENAME)
+    host = _tuning_host(url)
+    with _aria2_tuning_lock:
+        tuning = _load_json(path) or {}
+        levels = tuning.setdefault(host, {})
+        previous = levels.get(str(connections), {}).get("bytes_per_sec")
+        speed = size / seconds if previous is None else 0.5 * previous + 0.5 * size / seconds
+        levels[str(connections)] = {"bytes_per_sec": speed, "updated": int(time.time())}
+        _write_json_atomic(path, tuning)
+
+
+# --- aria2c RPC daemon ---
+ARIA2_MAX_ACTIVE_DOWNLOADS = 6 # Files aria2c transfers at once across all jobs; with 16 connections each this caps the total
+ARIA2_POLL_INTERVAL = 0.5 # Seconds between tellStatus polls while a job's files download
+
+
+class Aria2RpcError(Exception):
+    """aria2c rejected a JSON-RPC call or could not be reached."""
+
+
+class Aria2RpcClient:
+    """Minimal aria2 JSON-RPC client; holds only the endpoint and secret, so it can be sent to engine processes."""
+
+    def __init__(self, port, secret, tuning_dir=None):
+        self.endpoint = f"http://127.0.0.1:{port}/jsonrpc"
+        self.secret = secret
+        self.tuning_dir = tuning_dir # Where aria2_fetch_formats keeps the per-host aria2c tuning
+
+    def call(self, method, *params):
+        payload = {"jsonrpc": "2.0", "id": "ytd", "method": method, "params": [f"token:{self.secret}", *params]}
+        try:
+            body = http_session().post(self.endpoint, json=payload, timeout=(2, 10)).json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise Aria2RpcError(f"aria2c RPC {method} failed: {e}") from e
+        if "error" in body:
+            raise Aria2RpcError(f"aria2c RPC {method} failed: {body['error'].get('message')}")
+        return body["result"]
+
+
+class Aria2RpcDaemon:
+    """
+    One aria2c process with JSON-RPC on a loopback port, shared by every job. Global limits
+    (active downloads, overall bandwidth) live here instead of in one aria2c per job, and
+    aria2c reuses its DNS cache and connections across downloads. --stop-with-process ties
+    the daemon's lifetime to the app's.
+    """
+    start_timeout = 5 # Seconds to wait for the RPC port to answer
+
+    def __init__(self, aria2c_path, download_limit=0, tuning_dir=None):
+        self.aria2c_path = aria2c_path
+        self.download_limit = download_limit # Bytes per second across all downloads, 0 = unlimited
+        self.tuning_dir = tuning_dir
+        self.process = None
+        self.client = None
+
+    def start(self):
+        with socket.socket() as probe: # Let the OS pick a free loopback port
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        secret = secrets.token_hex(16)
+        command = [
+            self.aria2c_path, "--enable-rpc", "--rpc-listen-all=false", f"--rpc-listen-port={port}",
+            f"--rpc-secret={secret}", f"--stop-with-process={os.getpid()}",
+            f"--max-concurrent-downloads={ARIA2_MAX_ACTIVE_DOWNLOADS}", f"--max-overall-download-limit={self.download_limit}",
+            "--max-connection-per-server=16", "--split=16", "--min-split-size=1M", # Defaults; each file gets tuned values
+            "--continue=true", "--allow-overwrite=true", "--auto-file-renaming=false", "--file-allocation=none",
+            "--quiet=true",
+        ]
+        self.process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        client = Aria2RpcClient(port, secret, self.tuning_dir)
+        deadline = time.monotonic() + self.start_timeout
+        while True:
+            try:
+                version = client.call("aria2.getVersion")["version"]
+                break
+            except Aria2RpcError:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.shutdown()
+                    raise
+                time.sleep(0.1)
+        self.client = client
+        return version
+
+    def set_download_limit(self, limit):
+        self.download_limit = limit
+        if self.client:
+            self.client.call("aria2.changeGlobalOption", {"max-overall-download-limit": str(limit)})
+
+    def shutdown(self):
+        if self.client:
+            try:
+                self.client.call("aria2.forceShutdown")
+            except Aria2RpcError:
+                pass
+            self.client = None
+        if self.process:
+            try:
+                self.process.wait(5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+
+
+def aria2_fetch_formats(client, info, filename, on_log, on_progress, is_cancelled):
+    """
+    Downloads the formats yt-dlp selected for one video through the aria2c daemon, to the
+    exact file names yt-dlp would use (title.f<format id>.<ext> for formats it merges), so a
+    following --load-info-json run finds them and only merges and post-processes. Returns
+    False when the formats need yt-dlp's own downloader (HLS/DASH fragments) or the transfer
+    failed; partial files are removed so yt-dlp starts clean. Each file gets split and
+    connection options tuned for its size and host, and its measured throughput is fed back.
+    """
+    formats = info.get("requested_formats") or [info]
+    if any(fmt.get("protocol") not in ("http", "https") or not fmt.get("url") for fmt in formats):
+        return False
+    base = os.path.splitext(filename)[0]
+    targets = [filename] if len(formats) == 1 else [f"{base}.f{fmt['format_id']}.{fmt['ext']}" for fmt in formats]
+    gids = []
+    pending = {} # gid -> throughput sample of the file until it completes, see below
+    try:
+        # Under a global speed cap the cap sets the speed, not the connection count
+        capped = client.call("aria2.getGlobalOption").get("max-overall-download-limit", "0") != "0"
+        for fmt, target in zip(formats, targets):
+            if os.path.exists(target) and not os.path.exists(target + ".aria2"):
+                continue # Finished earlier; yt-dlp will skip it too
+            tuned = aria2_options_for(client.tuning_dir, fmt["url"], fmt.get("filesize") or fmt.get("filesize_approx"))
+            on_log(f"aria2c {fmt['format_id']} from {_tuning_host(fmt['url'])}: {tuned['split']} connections, "
+                   f"{tuned['min-split-size']} pieces")
+            options = {
+                "dir": os.path.dirname(os.path.abspath(target)),
+                "out": os.path.basename(target),
+                "header": [f"{key}: {value}" for key, value in (fmt.get("http_headers") or {}).items()],
+                **tuned,
+            }
+            gids.append((client.call("aria2.addUri", [fmt["url"]], options), target))
+            if not capped:
+                pending[gids[-1][0]] = {"url": fmt["url"], "connections": int(tuned["split"]),
+                                        "bytes": 0, "seconds": 0.0, "last": None}
+        keys = ["gid", "status", "totalLength", "completedLength", "downloadSpeed", "errorMessage"]
+        while gids:
+            if is_cancelled():
+                raise Aria2RpcError("cancelled")
+            statuses = [client.call("aria2.tellStatus", gid, keys) for gid, _ in gids]
+            now = time.monotonic()
+            for status in statuses:
+                sample = pending.get(status["gid"])
+                if not sample:
+                    continue
+                # Only time spent active counts: a file waiting in aria2c's queue (at most
+                # ARIA2_MAX_ACTIVE_DOWNLOADS run at once) says nothing about its connections
+                completed = int(status["completedLength"])
+                if sample["last"] and status["status"] in ("active", "complete"):
+                    sample["seconds"] += now - sample["last"][0]
+                    sample["bytes"] += completed - sample["last"][1]
+                sample["last"] = (now, completed) if status["status"] == "active" else None
+                if status["status"] == "complete":
+                    del pending[status["gid"]]
+                    record_aria2_result(client.tuning_dir, sample["url"], sample["connections"],
+                                        sample["bytes"], sample["seconds"])
+            failed = [status for status in statuses if status["status"] in ("error", "removed")]
+            if failed:
+                raise Aria2RpcError(failed[0].get("errorMessage") or f"download {failed[0]['status']}")
+            done = sum(int(status["completedLength"]) for status in statuses)
+            total = sum(int(status["totalLength"]) for status in statuses)
+            speed = sum(int(status["downloadSpeed"]) for status in statuses)
+            if all(status["status"] == "complete" for status in statuses):
+                on_progress({"status": "finished", "downloaded_bytes": done, "total_bytes": total})
+                return True
+            on_progress({"status": "downloading", "downloaded_bytes": done, "total_bytes": total or None,
+                         "speed": speed or None, "eta": (total - done) // speed if speed and total else None})
+            time.sleep(ARIA2_POLL_INTERVAL)
+        return True
+    except Aria2RpcError as e:
+        if not is_cancelled():
+            on_log(f"aria2c transfer failed ({e}); letting yt-dlp download instead.")
+        for gid, target in gids:
+            try:
+                client.call("aria2.remove", gid)
+            except Aria2RpcError:
+                pass
+            for path in (target, target + ".aria2"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return False
+
+
+# --- Download engines ---
+ENGINE_IN_PROCESS = "in-process"
+ENGINE_WORKER_POOL = "worker-pool"
+ENGINE_SUBPROCESS = "subprocess"
+YT_DLP_ENGINE_SNAPSHOT = "yt-dlp-engine-{}.zip" # Private links to the zipapp the engines import from
+_yt_dlp_module = None # (sys.path entry, or None for the installed package; module)
+_yt_dlp_module_users = 0 # In-process jobs running on _yt_dlp_module
+_yt_dlp_module_lock = threading.Lock()
+_stale_snapshots_removed = False
+
+
+def in_process_engine_available(yt_dlp_exec):
+    """Cheap check (no import) for whether the yt_dlp package can be loaded in-process."""
+    if yt_dlp_exec and zipfile.is_zipfile(yt_dlp_exec):
+        return True
+    return importlib.util.find_spec("yt_dlp") is not None
+
+
+def yt_dlp_import_path(yt_dlp_exec):
+    """
+    Returns the sys.path entry that makes the tools/yt-dlp zipapp importable, or None when it
+    is not a zipapp (Windows builds are PyInstaller executables). The zipapp is imported
+    through a hard link named after its content, so a later update swap, which renames a new
+    file over tools/yt-dlp, cannot change an archive that zipimport is still reading.
+    """
+    global _stale_snapshots_removed
+    if not yt_dlp_exec or not zipfile.is_zipfile(yt_dlp_exec):
+        return None
+    tools_dir = os.path.dirname(yt_dlp_exec)
+    snapshot = os.path.join(tools_dir, YT_DLP_ENGINE_SNAPSHOT.format(_file_sha256(yt_dlp_exec)[:16]))
+    if not _stale_snapshots_removed: # Earlier runs' snapshots; nothing in this process reads them
+        _stale_snapshots_removed = True
+        prefix = YT_DLP_ENGINE_SNAPSHOT.split("{")[0]
+        for name in os.listdir(tools_dir):
+            path = os.path.join(tools_dir, name)
+            if name.startswith(prefix) and path != snapshot:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    if not os.path.exists(snapshot):
+        _link_or_copy(yt_dlp_exec, snapshot)
+    return snapshot
+
+
+def load_yt_dlp_module(yt_dlp_exec):
+    """
+    Imports yt_dlp for one in-process job; pair every successful call with
+    release_yt_dlp_module(). The tools/yt-dlp zipapp comes first, so background updates reach
+    this engine; the pip-installed package is only used when tools/yt-dlp is not a zipapp.
+    After an update the new build is imported once no in-process job still runs on the old
+    one, because yt-dlp imports some of its modules lazily mid-job. Returns None when neither
+    source is importable.
+    """
+    global _yt_dlp_module, _yt_dlp_module_users
+    with _yt_dlp_module_lock:
+        try:
+            import_path = yt_dlp_import_path(yt_dlp_exec)
+        except OSError:
+            import_path = None
+        if _yt_dlp_module and (_yt_dlp_module[0] == import_path or _yt_dlp_module_users):
+            _yt_dlp_module_users += 1
+            return _yt_dlp_module[1]
+        if _yt_dlp_module: # Drop the old build so the import below loads the new one
+            for name in [name for name in sys.modules if name == "yt_dlp" or name.startswith("yt_dlp.")]:
+                del sys.modules[name]
+            if _yt_dlp_module[0] in sys.path:
+                sys.path.remove(_yt_dlp_module[0])
+            _yt_dlp_module = None
+        if import_path:
+            sys.path.insert(0, import_path)
+        importlib.invalidate_caches()
+        try:
+            module = importlib.import_module("yt_dlp")
+        except ImportError:
+            if import_path:
+                sys.path.remove(import_path)
+            return None
+        _yt_dlp_module = (import_path, module)
+        _yt_dlp_module_users += 1
+        return module
+
+
+def release_yt_dlp_module():
+    global _yt_dlp_module_users
+    with _yt_dlp_module_lock:
+        _yt_dlp_module_users -= 1
+
+
+def describe_yt_dlp_module(yt_dlp):
+    """Names the imported build for the job log, e.g. 'yt-dlp 2025.01.15 (tools/yt-dlp)'."""
+    version = getattr(getattr(yt_dlp, "version", None), "__version__", "unknown version")
+    if YT_DLP_ENGINE_SNAPSHOT.split("{")[0] in (yt_dlp.__file__ or ""):
+        return f"yt-dlp {version} (tools/yt-dlp)"
+    return f"yt-dlp {version} (installed yt_dlp package at {os.path.dirname(yt_dlp.__file__)})"
+
+
+def describe_yt_dlp_exec(yt_dlp_exec):
+    """Names the executable the subprocess engine runs, with its version from the tool manifest."""
+    entry = (load_tool_manifest(os.path.dirname(yt_dlp_exec)) or {}).get("yt-dlp") or {}
+    if entry.get("file") == os.path.basename(yt_dlp_exec):
+        return f"yt-dlp {entry['version']} ({yt_dlp_exec})"
+    return f"yt-dlp ({yt_dlp_exec})"
+
+
+class _SignalLogger:
+    """yt-dlp logger that forwards screen output to a callback."""
+
+    def __init__(self, emit):
+        self._emit = emit
+
+    def debug(self, msg):
+        # yt-dlp routes ordinary screen output through debug(); only real debug lines carry the prefix
+        if not msg.startswith("[debug] "):
+            self._emit(msg)
+
+    def info(self, msg):
+        self._emit(msg)
+
+    def warning(self, msg):
+        self._emit(f"WARNING: {msg}")
+
+    def error(self, msg):
+        self._emit(msg)
+
+
+def run_yt_dlp_job(yt_dlp, args, url, on_log, on_progress, is_cancelled, aria2_rpc=None):
+    """
+    Downloads url with an imported yt_dlp module, configured from the same command-line
+    options the subprocess engine passes. Progress comes from hooks rather than parsed
+    output and is passed to on_progress as a progress_from_hook() dict. With aria2_rpc, a
+    single video's formats are fetched by the shared aria2c daemon first and yt-dlp only
+    merges and post-processes them. Either way the URL is extracted once: the download
+    continues from the extracted info, and playlists are only listed up front, so each
+    entry is resolved once, when its turn comes. Returns (success, message).
+    """
+    last_report = [0.0]
+
+    def check_cancelled():
+        if is_cancelled():
+            raise getattr(yt_dlp.utils, "DownloadCancelled", KeyboardInterrupt)()
+
+    def log(msg):
+        on_log(msg)
+        check_cancelled() # Extraction and post-processing fire no progress hooks, but log every step
+
+    def progress_hook(status):
+        check_cancelled()
+        if status["status"] == "downloading":
+            now = time.monotonic()
+            if now - last_report[0] >= PROGRESS_INTERVAL: # Hooks fire per chunk
+                last_report[0] = now
+                on_progress(progress_from_hook(status))
+        elif status["status"] == "finished":
+            on_progress(progress_from_hook(status))
+            on_log(f"Downloaded {status.get('filename', '')}")
+
+    def postprocessor_hook(status):
+        check_cancelled()
+        if status["status"] == "started":
+            on_log(f"Post-processing: {status.get('postprocessor', '')}")
+
+    try:
+        options = yt_dlp.parse_options(args).ydl_opts
+        options.update({
+            "logger": _SignalLogger(log),
+            "noprogress": True, # Progress arrives through the hook
+            "progress_hooks": [progress_hook],
+            "postprocessor_hooks": [postprocessor_hook],
+        })
+        with yt_dlp.YoutubeDL(options) as ydl:
+            if not aria2_rpc:
+                retcode = ydl.download([url])
+            else:
+                # Like -J --flat-playlist: a playlist's entries are listed, not resolved
+                extract_flat = ydl.params.get("extract_flat")
+                ydl.params["extract_flat"] = "in_playlist"
+                try:
+                    info = ydl.extract_info(url, download=False)
+                finally:
+                    ydl.params["extract_flat"] = extract_flat
+                if info is None: # Extraction failed and yt-dlp has logged why
+                    return False, "Download failed: could not extract the video information."
+                if info.get("_type", "video") == "video":
+                    aria2_fetch_formats(aria2_rpc, info, ydl.prepare_filename(info), on_log, on_progress, is_cancelled)
+                # Finish from the extracted info, so the URL is not extracted a second time.
+                # Unclean, or yt-dlp drops a playlist's entries on loading and extracts the URL again.
+                ydl.params["clean_infojson"] = False
+                with tempfile.NamedTemporaryFile("w", suffix=".info.json", delete=False, encoding="utf-8") as info_file:
+                    json.dump(ydl.sanitize_info(info, remove_private_keys=False), info_file)
+                try:
+                    retcode = ydl.download_with_info_file(info_file.name)
+                finally:
+                    os.remove(info_file.name)
+    except yt_dlp.utils.DownloadError as e:
+        return False, "Download cancelled." if is_cancelled() else f"Download failed: {e}"
+    except BaseException as e: # DownloadCancelled derives from BaseException in recent releases
+        if is_cancelled():
+            return False, "Download cancelled."
+        return False, f"An unexpected error occurred: {e}"
+    if retcode == 0:
+        return True, "Download completed successfully!"
+    return False, f"Download failed with error code: {retcode}"
+
+
+def _resident_memory():
+    """Resident set size of this process in bytes, or 0 where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0
+
+
+def _engine_process_main(conn, import_path):
+    """
+    Entry point of a pooled engine process. Imports yt_dlp and every extractor once, then
+    runs jobs received as ("job", args, url, aria2 client or None) and streams ("log", msg) and ("progress", fields)
+    events back, ending each job with ("done", success, message, resident bytes). import_path
+    (the tools/yt-dlp zipapp) goes first on sys.path, so it wins over an installed package.
+    """
+    if import_path:
+        sys.path.insert(0, import_path)
+    import yt_dlp
+    from yt_dlp.extractor import gen_extractor_classes
+    gen_extractor_classes() # Pay for the extractor imports now rather than on the first job
+    conn.send(("ready", _resident_memory(), describe_yt_dlp_module(yt_dlp)))
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError: # The app went away
+            return
+        if message[0] == "stop":
+            return
+        if message[0] != "job": # A cancel that arrived after its job had already finished
+            continue
+        _, args, url, aria2_rpc = message
+        cancelled = [False]
+
+        def is_cancelled():
+            while not cancelled[0] and conn.poll():
+                cancelled[0] = conn.recv()[0] == "cancel"
+            return cancelled[0]
+
+        success, result = run_yt_dlp_job(
+            yt_dlp, args, url,
+            lambda msg: conn.send(("log", msg)),
+            lambda fields: conn.send(("progress", fields)),
+            is_cancelled, aria2_rpc)
+        conn.send(("done", success, result, _resident_memory()))
+
+
+class EngineProcessError(Exception):
+    """A pooled engine process could not be started or died mid-job."""
+
+
+class _EngineProcess:
+    def __init__(self, process, conn, baseline_memory, generation, yt_dlp_description):
+        self.process = process
+        self.conn = conn
+        self.baseline_memory = baseline_memory # Resident bytes right after the warm-up imports
+        self.generation = generation
+        self.yt_dlp_description = yt_dlp_description # Which yt_dlp build the process imported
+        self.jobs_done = 0
+
+    def stop(self):
+        try:
+            self.conn.send(("stop",))
+        except OSError:
+            pass
+        self.process.join(2)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class EngineProcessPool:
+    """
+    Long-lived "spawn" processes that have already imported yt_dlp, handed out one job at a
+    time. A process is retired after max_jobs_per_process jobs or once it has grown by
+    max_memory_growth bytes; one that crashes only takes its current job down with it.
+    """
+    max_jobs_per_process = 25
+    max_memory_growth = 256 * 1024 * 1024
+    start_timeout = 60 # Seconds a new process may take to import yt_dlp
+
+    def __init__(self, yt_dlp_exec, max_idle=3):
+        self.max_idle = max_idle
+        self._context = multiprocessing.get_context("spawn") # Never fork a process that runs Qt threads
+        self._idle = []
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._closed = False
+        self.set_yt_dlp_exec(yt_dlp_exec)
+
+    def set_yt_dlp_exec(self, yt_dlp_exec):
+        """Points new processes at another yt-dlp build and retires the idle ones. The
+        tools/yt-dlp zipapp is used whenever it is one, so updates reach the pool; otherwise
+        the processes fall back to the installed yt_dlp package."""
+        try:
+            import_path = yt_dlp_import_path(yt_dlp_exec)
+        except OSError:
+            import_path = None
+        with self._lock:
+            self._import_path = import_path
+            self._generation += 1
+            retired, self._idle = self._idle, []
+        for engine in retired:
+            engine.stop()
+
+    def _spawn(self):
+        with self._lock:
+            import_path, generation = self._import_path, self._generation
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_engine_process_main, args=(child_conn, import_path),
+                                        name="yt-dlp-engine", daemon=True)
+        process.start()
+        child_conn.close()
+        try:
+            if not parent_conn.poll(self.start_timeout):
+                raise EngineProcessError("engine process did not start in time")
+            _, baseline_memory, yt_dlp_description = parent_conn.recv()
+        except (EOFError, OSError, EngineProcessError) as e:
+            process.kill()
+            parent_conn.close()
+            raise EngineProcessError(f"Could not start a yt-dlp engine process (exit code {process.exitcode}): {e}") from e
+        return _EngineProcess(process, parent_conn, baseline_memory, generation, yt_dlp_description)
+
+    def prewarm(self, count):
+        """Starts idle processes up to count, in a background thread."""
+        def fill():
+            while True:
+                with self._lock:
+                    if self._closed or len(self._idle) >= min(count, self.max_idle):
+                        return
+                try:
+                    engine = self._spawn()
+                except EngineProcessError:
+                    return
+                self._put_idle(engine)
+        threading.Thread(target=fill, name="yt-dlp-engine-prewarm", daemon=True).start()
+
+    def acquire(self):
+        with self._lock:
+            while self._idle:
+                engine = self._idle.pop()
+                if engine.process.is_alive():
+                    return engine
+        return self._spawn()
+
+    def release(self, engine, resident_memory):
+        """Returns a process after a completed job, or retires it if it has done enough."""
+        engine.jobs_done += 1
+        grown = resident_memory and engine.baseline_memory and resident_memory - engine.baseline_memory > self.max_memory_growth
+        if engine.jobs_done >= self.max_jobs_per_process or grown:
+            engine.stop()
+            return
+        self._put_idle(engine)
+
+    def discard(self, engine):
+        """Drops a process that crashed or was killed mid-job."""
+        if engine.process.is_alive():
+            engine.process.kill()
+        engine.process.join(2)
+        engine.conn.close()
+
+    def _put_idle(self, engine):
+        with self._lock:
+            if not self._closed and engine.generation == self._generation and len(self._idle) < self.max_idle:
+                self._idle.append(engine)
+                return
+        engine.stop()
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for engine in idle:
+            engine.stop()
+
+
 # --- Worker Thread for Downloading YouTube Video ---
 class DownloadWorker(QThread):
     """
     A separate thread to run the yt-dlp download process so the GUI doesn't freeze.
     """
-    # Signals to send output and status to the GUI
-    update_progress = pyqtSignal(str)
-    download_finished = pyqtSignal(bool, str) # bool: success, str: message
-    update_progress_bar = pyqtSignal(int, str) # value, text
+    # Signals to send output and status to the GUI; the first argument is always the job id
+    update_progress = pyqtSignal(int, str)
+    download_finished = pyqtSignal(int, bool, str) # bool: success, str: message
+    update_transfer = pyqtSignal(int, object) # progress fields dict (see PROGRESS_FIELDS)
 
-    def __init__(self, url, output_path, format_choice, yt_dlp_exec, ffmpeg_exec):
+    cancel_grace = 10 # Seconds a pooled engine gets to stop a cancelled job before it is killed
+
+    def __init__(self, job, yt_dlp_exec, ffmpeg_exec, engine_pool=None, aria2c=None, aria2_rpc=None):
         super().__init__()
-        self.url = url
-        self.output_path = output_path
-        self.format_choice = format_choice
+        self.job = job
         self.yt_dlp_exec = yt_dlp_exec
         self.ffmpeg_exec = ffmpeg_exec
+        self.engine_pool = engine_pool
+        self.aria2c = aria2c # (path, version) from probe_aria2c, or None for the native downloader
+        self.aria2_rpc = aria2_rpc # Client for the shared aria2c daemon; takes over from per-job aria2c
+        self.process = None
+        self._engine = None # Pooled engine process running this job
+        self._cancelled = False
+
+    def cancel(self):
+        """Stops the yt-dlp process; the job finishes as failed."""
+        self._cancelled = True
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+
+    def kill(self):
+        """
+        Force-stops a job that did not react to cancel(): kills its yt-dlp or engine process.
+        An in-process job cannot be killed; it stops at its next log line or hook.
+        """
+        self._cancelled = True
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+        engine = self._engine
+        if engine and engine.process.is_alive():
+            engine.process.kill()
 
     def run(self):
         """
         The download logic that will be executed in a separate thread.
         """
-        self.update_progress.emit(f"Starting download from: {self.url}\n")
-        self.update_progress.emit(f"Saving to: {self.output_path}\n")
-        self.update_progress_bar.emit(0, "Downloading...")
-
+        job_id = self.job.job_id
+        self.update_progress.emit(job_id, f"Starting download from: {self.job.url}\n")
+        self.update_progress.emit(job_id, f"Saving to: {self.job.output_path}\n")
+        self.update_progress.emit(job_id, f"Transfer engine: {describe_transfer(self.aria2c, self.aria2_rpc)}")
+
+        if self.job.engine == ENGINE_WORKER_POOL and self.engine_pool:
+            try:
+                engine = self.engine_pool.acquire()
+            except EngineProcessError as e:
+                self.update_progress.emit(job_id, f"{e}; falling back to the yt-dlp executable.")
+            else:
+                self._run_in_pool(engine)
+                return
+        elif self.job.engine == ENGINE_IN_PROCESS:
+            yt_dlp = load_yt_dlp_module(self.yt_dlp_exec)
+            if yt_dlp is not None:
+                try:
+                    self._run_in_process(yt_dlp)
+                finally:
+                    release_yt_dlp_module()
+                return
+            self.update_progress.emit(job_id, "yt_dlp module not available; falling back to the yt-dlp executable.")
+        self._run_subprocess()
+
+    def _yt_dlp_args(self):
+        """Command-line options for the job, shared by both engines (the in-process one parses them with yt-dlp)."""
+        # With the daemon, yt-dlp itself only handles what aria2c cannot (fragmented formats, merging)
+        args = transfer_args(None if self.aria2_rpc else self.aria2c) + [
+            "--ffmpeg-location", self.ffmpeg_exec,
+            "-o", os.path.join(self.job.output_path, "%(title)s.%(ext)s"),
+            # Progress as one JSON object per line (ignored by the in-process engines, which use hooks)
+            "--newline", "--progress-template", PROGRESS_TEMPLATE, "--progress-delta", str(PROGRESS_INTERVAL),
+        ]
+
+        if self.job.format_choice == "mp3":
+            args.extend(["-x", "--audio-format", "mp3", "--audio-quality", "0"])
+        elif self.job.format_choice == "best":
+            args.append("-f")
+            args.append("bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best")
+        else:
+            args.append("-f")
+            args.append(self.job.format_choice)
+        return args
+
+    def _run_in_process(self, yt_dlp):
+        """Drives yt_dlp.YoutubeDL in this thread."""
+        job_id = self.job.job_id
+        self.update_progress.emit(job_id, f"Using {describe_yt_dlp_module(yt_dlp)} in-process")
+        success, message = run_yt_dlp_job(
+            yt_dlp, self._yt_dlp_args(), self.job.url,
+            lambda msg: self.update_progress.emit(job_id, msg),
+            lambda fields: self.update_transfer.emit(job_id, fields),
+            lambda: self._cancelled, self.aria2_rpc)
+        self.download_finished.emit(job_id, success, message)
+
+    def _run_in_pool(self, engine):
+        """Hands the job to a pre-warmed engine process and relays its events."""
+        job_id = self.job.job_id
+        self.update_progress.emit(job_id, f"Using {engine.yt_dlp_description} in engine process {engine.process.pid}")
+        cancel_deadline = None
+        self._engine = engine
         try:
-            command = [
-                self.yt_dlp_exec,
-                "--external-downloader", "aria2c",
-                "--external-downloader-args", "-x 16 -s 16 -k 1M",
-                "--ffmpeg-location", self.ffmpeg_exec,
-                "-o", os.path.join(self.output_path, "%(title)s.%(ext)s"),
-            ]
-
-            if self.format_choice == "mp3":
-                command.extend(["-x", "--audio-format", "mp3", "--audio-quality", "0"])
-            elif self.format_choice == "best":
-                command.append("-f")
-                command.append("bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best")
+            engine.conn.send(("job", self._yt_dlp_args(), self.job.url, self.aria2_rpc))
+            while True:
+                if self._cancelled and cancel_deadline is None:
+                    engine.conn.send(("cancel",))
+                    cancel_deadline = time.monotonic() + self.cancel_grace
+                if cancel_deadline and time.monotonic() > cancel_deadline:
+                    raise EngineProcessError("engine process did not stop after cancel")
+                if not engine.conn.poll(0.2):
+                    continue
+                event = engine.conn.recv()
+                if event[0] == "log":
+                    self.update_progress.emit(job_id, event[1])
+                elif event[0] == "progress":
+                    self.update_transfer.emit(job_id, event[1])
+                elif event[0] == "done":
+                    _, success, message, resident_memory = event
+                    break
+        except (EOFError, OSError, EngineProcessError) as e:
+            self._engine = None
+            self.engine_pool.discard(engine)
+            if self._cancelled:
+                self.download_finished.emit(job_id, False, "Download cancelled.")
             else:
-                command.append("-f")
-                command.append(self.format_choice)
+                detail = f": {e}" if str(e) else ""
+                self.download_finished.emit(job_id, False, f"yt-dlp engine process exited unexpectedly "
+                                                           f"(exit code {engine.process.exitcode}){detail}")
+            return
+        self._engine = None
+        self.engine_pool.release(engine, resident_memory)
+        self.download_finished.emit(job_id, success, message)
 
-            command.append(self.url)
+    def _extract_info(self):
+        """
+        Runs yt-dlp -J --flat-playlist for the job, which lists a playlist's entries without
+        resolving them. Returns (succeeded, info); a single video's info carries its output
+        file name in "_filename". info is None if yt-dlp printed something unexpected.
+        """
+        self.process = subprocess.Popen(
+            [self.yt_dlp_exec] + self._yt_dlp_args() + ["-J", "--flat-playlist", "--print", "%(filename)j", self.job.url],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding="utf-8")
+        stdout, stderr = self.process.communicate()
+        for line in stderr.splitlines():
+            self.update_progress.emit(self.job.job_id, line)
+        lines = stdout.splitlines()
+        if self.process.returncode != 0:
+            return False, None
+        try:
+            # The printed file names come first, one per processed video; the info is the last line
+            info = json.loads(lines[-1])
+            if info.get("_type", "video") == "video":
+                if len(lines) != 2:
+                    return True, None
+                info["_filename"] = json.loads(lines[0])
+            return True, info
+        except (ValueError, IndexError, AttributeError):
+            return True, None
+
+    def _run_subprocess(self):
+        job_id = self.job.job_id
+        self.update_progress.emit(job_id, f"Using {describe_yt_dlp_exec(self.yt_dlp_exec)}")
+        info_path = None
+        try:
+            command = [self.yt_dlp_exec] + self._yt_dlp_args() + [self.job.url]
+            extracted, info = self._extract_info() if self.aria2_rpc else (True, None)
+            if not extracted and not self._cancelled: # yt-dlp has logged why
+                self.download_finished.emit(job_id, False, f"Download failed with error code: {self.process.returncode}")
+                return
+            if info and not self._cancelled:
+                if info.get("_type", "video") == "video":
+                    aria2_fetch_formats(
+                        self.aria2_rpc, info, info.get("_filename") or info.get("filename", ""),
+                        lambda msg: self.update_progress.emit(job_id, msg),
+                        lambda fields: self.update_transfer.emit(job_id, fields),
+                        lambda: self._cancelled)
+                # Continue from the extracted info instead of the URL, so nothing is extracted twice.
+                # yt-dlp picks up the files aria2c wrote and merges or post-processes them.
+                with tempfile.NamedTemporaryFile("w", suffix=".info.json", delete=False, encoding="utf-8") as info_file:
+                    json.dump(info, info_file)
+                info_path = info_file.name
+                # Unclean, or yt-dlp drops a playlist's entries on loading and extracts the URL again
+                command = [self.yt_dlp_exec] + self._yt_dlp_args() + ["--load-info-json", info_path, "--no-clean-info-json"]
 
             # Run the subprocess and capture output in real-time
-            process = subprocess.Popen(
+            self.process = subprocess.Popen(
                 command,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT, # Merge stderr into stdout
@@ -241,50 +2423,560 @@ class DownloadWorker(QThread):
                 bufsize=1, # Line-buffered
                 universal_newlines=True # For cross-platform compatibility
             )
+            if self._cancelled: # cancel() may have run before the process existed
+                self.process.terminate()
+
+            for line in self.process.stdout:
+                fields = parse_progress_line(line)
+                if fields is not None:
+                    self.update_transfer.emit(job_id, fields)
+                    continue
+                self.update_progress.emit(job_id, line) # Send each line of output to the GUI
+
+            self.process.wait() # Wait for the process to finish
+
+            if self._cancelled:
+                self.download_finished.emit(job_id, False, "Download cancelled.")
+            elif self.process.returncode == 0:
+                self.download_finished.emit(job_id, True, "Download completed successfully!")
+            else:
+                self.download_finished.emit(job_id, False, f"Download failed with error code: {self.process.returncode}")
 
-            for line in process.stdout:
-                self.update_progress.emit(line) # Send each line of output to the GUI
-                # Try to update the progress bar from yt-dlp output
-                if "%" in line:
-                    try:
-                        parts = line.split()
-                        for part in parts:
-                            if part.endswith("%"):
-                                progress_str = part.replace("%", "")
-                                if '.' in progress_str: # Handle float percentages
-                                    progress_value = int(float(progress_str))
-                                else:
-                                    progress_value = int(progress_str)
-                                self.update_progress_bar.emit(progress_value, f"Downloading: {progress_value}%")
-                                break
-                    except ValueError:
-                        pass # Ignore if parsing fails
+        except FileNotFoundError:
+            self.download_finished.emit(job_id, False, "Error: yt-dlp or ffmpeg executable not found. Ensure paths are correct and executables exist.")
+        except Exception as e:
+            self.download_finished.emit(job_id, False, f"An unexpected error occurred: {e}")
+        finally:
+            if info_path:
+                os.remove(info_path)
 
-            process.wait() # Wait for the process to finish
 
-            if process.returncode == 0:
-                self.download_finished.emit(True, "Download completed successfully!")
-            else:
-                self.download_finished.emit(False, f"Download failed with error code: {process.returncode}")
+class BatchDownloadWorker(DownloadWorker):
+    """
+    Downloads several jobs with one yt-dlp process, so start-up is paid once per batch.
+    URLs go in through --batch-file on stdin, and the output is split back per job. yt-dlp
+    handles URLs in order and announces each one with an "Extracting URL" line, which opens
+    that job's segment. A printed marker after each moved file confirms a success, and
+    --ignore-errors keeps one failed URL from stopping the rest.
+    """
+    DONE_MARKER = "[ytd-done] "
+
+    def __init__(self, jobs, yt_dlp_exec, ffmpeg_exec, aria2c=None):
+        super().__init__(jobs[0], yt_dlp_exec, ffmpeg_exec, aria2c=aria2c)
+        self.jobs = jobs
+
+    def _match_job(self, printed_url, pending):
+        """Finds the pending job a URL from yt-dlp's output refers to; long URLs are printed truncated."""
+        for job in pending:
+            if printed_url == job.url:
+                return job
+        if "..." in printed_url:
+            head, tail = printed_url.split("...", 1)
+            for job in pending:
+                if job.url.startswith(head) and job.url.endswith(tail):
+                    return job
+        return None
 
+    def run(self):
+        pending = list(self.jobs) # Jobs whose segment has not started yet, in yt-dlp's order
+        results = {job.job_id: {"done": 0, "error": None} for job in self.jobs}
+        current = None
+
+        def finish(job, fallback_error):
+            result = results.pop(job.job_id)
+            if result["done"] and not result["error"]:
+                self.download_finished.emit(job.job_id, True, "Download completed successfully!")
+            else:
+                self.download_finished.emit(job.job_id, False, result["error"] or fallback_error)
+
+        yt_dlp_description = describe_yt_dlp_exec(self.yt_dlp_exec)
+        for job in self.jobs:
+            self.update_progress.emit(job.job_id, f"Queued in a batch of {len(self.jobs)} URLs; saving to: {job.output_path}\n")
+            self.update_progress.emit(job.job_id, f"Transfer engine: {describe_transfer(self.aria2c)}")
+            self.update_progress.emit(job.job_id, f"Using {yt_dlp_description}")
+        command = [self.yt_dlp_exec] + self._yt_dlp_args() + [
+            "--ignore-errors", "--no-quiet", "--no-simulate",
+            "--print", f"after_move:{self.DONE_MARKER}%(original_url)s",
+            "--batch-file", "-",
+        ]
+        try:
+            self.process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT, # Merge stderr into stdout
+                text=True,
+                bufsize=1, # Line-buffered
+                universal_newlines=True # For cross-platform compatibility
+            )
+            if self._cancelled: # cancel() may have run before the process existed
+                self.process.terminate()
+            self.process.stdin.write("".join(f"{job.url}\n" for job in self.jobs))
+            self.process.stdin.close()
+
+            for line in self.process.stdout:
+                fields = parse_progress_line(line)
+                if fields is not None:
+                    job = (self._match_job(fields["url"], self.jobs) if fields.get("url") else None) or current
+                    if job:
+                        self.update_transfer.emit(job.job_id, fields)
+                    continue
+                if line.startswith(self.DONE_MARKER):
+                    job = self._match_job(line[len(self.DONE_MARKER):].strip(), self.jobs) or current
+                    if job and job.job_id in results:
+                        results[job.job_id]["done"] += 1
+                    continue
+                if "Extracting URL: " in line:
+                    job = self._match_job(line.split("Extracting URL: ", 1)[1].strip(), pending)
+                    if job: # Anything else is a playlist entry inside the current URL
+                        # yt-dlp has moved on; whatever came before this job is settled
+                        for earlier in pending[:pending.index(job)] + ([current] if current else []):
+                            finish(earlier, "yt-dlp skipped this URL.")
+                        pending = pending[pending.index(job) + 1:]
+                        current = job
+                # Before the first "Extracting URL" line yt-dlp is still on the first URL (e.g. one it cannot parse)
+                target = current or self.jobs[0]
+                self.update_progress.emit(target.job_id, line)
+                if line.startswith("ERROR:") and target.job_id in results:
+                    results[target.job_id]["error"] = line.strip()
+
+            self.process.wait() # Wait for the process to finish
+            if self._cancelled:
+                fallback = "Download cancelled."
+            else:
+                fallback = f"yt-dlp exited with code {self.process.returncode} before finishing this URL."
         except FileNotFoundError:
-            self.download_finished.emit(False, "Error: yt-dlp or ffmpeg executable not found. Ensure paths are correct and executables exist.")
+            fallback = "Error: yt-dlp or ffmpeg executable not found. Ensure paths are correct and executables exist."
         except Exception as e:
-            self.download_finished.emit(False, f"An unexpected error occurred: {e}")
+            fallback = f"An unexpected error occurred: {e}"
+        # Settle every job still open; the last signal stays the thread's last act
+        for job in ([current] if current and current.job_id in results else []) + pending:
+            finish(job, fallback)
+
+
+# --- Session log file ---
+LOG_FILENAME = "downloads.log"
+LOG_MAX_BYTES = 5 * 1024 * 1024 # Per file; the oldest rotated file is deleted beyond LOG_BACKUP_COUNT
+LOG_BACKUP_COUNT = 5
+session_logger = logging.getLogger("yt_downloader")
+_session_log_listener = None
+
+
+def setup_session_log(log_dir):
+    """
+    Streams session_logger to a rotating file under log_dir and returns the file's path.
+    Records are queued and written by a listener thread, so logging never blocks a worker
+    on disk I/O.
+    """
+    global _session_log_listener
+    os.makedirs(log_dir, exist_ok=True)
+    log_path = os.path.join(log_dir, LOG_FILENAME)
+    if _session_log_listener is None:
+        handler = RotatingFileHandler(log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        records = queue.SimpleQueue()
+        _session_log_listener = QueueListener(records, handler)
+        _session_log_listener.start()
+        atexit.register(_session_log_listener.stop) # Write out whatever is still queued at exit
+        session_logger.addHandler(QueueHandler(records))
+        session_logger.setLevel(logging.INFO)
+        session_logger.propagate = False
+    return log_path
+
+
+def flush_session_log():
+    """Writes out every queued record; the listener restarts so logging can continue."""
+    if _session_log_listener is not None:
+        _session_log_listener.stop() # Drains the queue before returning
+        _session_log_listener.start()
+
+
+def _log_job_line(job_id, line):
+    # Runs in the worker thread, so every line reaches the file even when the GUI skips some
+    session_logger.info("[#%d] %s", job_id, line.rstrip())
+
+
+# --- Download Queue ---
+SITE_ALIASES = {"youtu.be": "youtube.com"} # Short-link hosts that hit the same extractor and servers
+
+
+def site_key(url):
+    """Groups URLs by the site they load, e.g. www.youtube.com, m.youtube.com and youtu.be all become youtube.com."""
+    host = urllib.parse.urlsplit(url if "//" in url else f"//{url}").hostname or ""
+    for prefix in ("www.", "m.", "music."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    return SITE_ALIASES.get(host, host)
+
+
+class TokenBucket:
+    """Allows bursts of up to capacity events, refilled at rate events per second."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def seconds_until_available(self):
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+
+class DownloadJob:
+    """One queued URL and its state as it moves through the scheduler."""
+    QUEUED, RUNNING, DONE, FAILED = "Queued", "Running", "Done", "Failed"
+    _ids = itertools.count(1)
+
+    def __init__(self, url, output_path, format_choice, engine=ENGINE_SUBPROCESS):
+        self.job_id = next(self._ids)
+        self.url = url
+        self.site = site_key(url)
+        self.output_path = output_path
+        self.format_choice = format_choice
+        self.engine = engine
+        self.state = DownloadJob.QUEUED
+        self.progress = 0
+        self.message = ""
+        self.waiting_for = "" # Why a queued job has not started yet
+        # Transfer state of the file currently downloading, from the engine's progress fields
+        self.downloaded_bytes = 0
+        self.total_bytes = None # Exact size, or yt-dlp's estimate when the size is unknown
+        self.speed = None # Bytes per second
+        self.eta = None # Seconds
+        self.fragment_index = None
+        self.fragment_count = None
+
+    def apply_progress(self, fields):
+        """Updates the transfer state from a progress fields dict (see PROGRESS_FIELDS)."""
+        self.downloaded_bytes = fields.get("downloaded_bytes") or 0
+        self.total_bytes = fields.get("total_bytes") or fields.get("total_bytes_estimate")
+        self.speed = fields.get("speed")
+        self.eta = fields.get("eta")
+        self.fragment_index = fields.get("fragment_index")
+        self.fragment_count = fields.get("fragment_count")
+        if fields.get("status") == "finished":
+            self.progress = 100
+        elif self.total_bytes:
+            self.progress = min(100, int(self.downloaded_bytes * 100 / self.total_bytes))
+        elif self.fragment_index and self.fragment_count:
+            self.progress = min(100, int(self.fragment_index * 100 / self.fragment_count))
+
+    def progress_text(self):
+        text = f"Downloading: {self.progress}%"
+        if self.total_bytes:
+            text += f" of {format_bytes(self.total_bytes)}"
+        if self.speed:
+            text += f" at {format_bytes(self.speed)}/s"
+        if self.eta is not None:
+            text += f", ETA {int(self.eta) // 60}:{int(self.eta) % 60:02d}"
+        if self.fragment_count:
+            text += f" (fragment {self.fragment_index}/{self.fragment_count})"
+        return text
+
+    def batch_key(self):
+        """Jobs with equal keys can share one yt-dlp invocation."""
+        return (self.site, self.format_choice, self.output_path, self.engine)
+
+    def describe(self):
+        state = f"{self.state}: {self.waiting_for}" if self.state == DownloadJob.QUEUED and self.waiting_for else self.state
+        speed = f" {format_bytes(self.speed)}/s" if self.state == DownloadJob.RUNNING and self.speed else ""
+        return f"#{self.job_id}  [{state}] {self.progress:3d}%{speed}  {self.url}"
+
+
+class OutputCoalescer:
+    """
+    Thread-safe hand-off from download workers to the GUI thread. Workers add log lines and
+    progress fields directly (no queued signal per line); the GUI drains it on a timer. Lines
+    queue up to max_lines, dropping the oldest beyond that, and progress keeps only the latest
+    fields per job, so a chatty process costs the GUI a bounded amount per tick.
+    """
+
+    def __init__(self, max_lines=5000):
+        self.max_lines = max_lines
+        self._lock = threading.Lock()
+        self._lines = deque() # (job id, line)
+        self._dropped = 0
+        self._progress = {} # Job id -> latest progress fields
+
+    def add_line(self, job_id, line):
+        with self._lock:
+            if len(self._lines) >= self.max_lines:
+                self._lines.popleft()
+                self._dropped += 1
+            self._lines.append((job_id, line))
+
+    def set_progress(self, job_id, fields):
+        with self._lock:
+            self._progress[job_id] = fields
+
+    def take(self, max_lines):
+        """Returns (up to max_lines lines, lines dropped since the last call, {job id: latest fields})."""
+        with self._lock:
+            count = min(max_lines, len(self._lines))
+            lines = [self._lines.popleft() for _ in range(count)]
+            dropped, self._dropped = self._dropped, 0
+            progress, self._progress = self._progress, {}
+        return lines, dropped, progress
+
+
+class DownloadScheduler(QObject):
+    """
+    Drains a FIFO of DownloadJobs with at most max_workers DownloadWorkers at once.
+    Workers come from worker_factory(jobs), called as jobs start, so they pick up whatever
+    tool paths are current at that moment. Subprocess-engine jobs that share a site, format
+    and folder are started together, up to batch_size per worker, so one yt-dlp process
+    (and one start-up) serves the whole group; a batch counts as one running worker.
+    Groups are spread over the free worker slots first, so batching never leaves a slot idle.
+
+    Each site is additionally capped at per_site_limit running jobs and paced by a token
+    bucket of starts_per_minute (bursting to site_burst), so one busy site cannot trigger
+    throttling; jobs for other sites skip past the ones that are held back. The defaults
+    never hold back a full set of workers and only smooth out large pastes, so a single
+    site still gets every parallel slot; lower them for sites that throttle.
+    """
+    site_burst = 8 # Starts a site may take back to back before pacing applies; fills every worker slot
+    flush_interval_ms = 50 # How often buffered worker output reaches the GUI
+    max_lines_per_flush = 200 # Log lines delivered per flush; the rest wait for the next tick
+
+    job_started = pyqtSignal(int)
+    job_output = pyqtSignal(object, int) # [(job id, line), ...], lines dropped since the last batch
+    job_progress = pyqtSignal(int, int, str) # job id, value, text
+    job_finished = pyqtSignal(int, bool, str) # job id, success, message
+    queue_changed = pyqtSignal() # Queued jobs were started or held back; waiting_for may have changed
+    queue_drained = pyqtSignal()
+
+    def __init__(self, worker_factory, max_workers=3, per_site_limit=8, starts_per_minute=60, batch_size=10, parent=None):
+        super().__init__(parent)
+        self.worker_factory = worker_factory
+        self.max_workers = max_workers
+        self.per_site_limit = per_site_limit
+        self.starts_per_minute = starts_per_minute
+        self.batch_size = batch_size
+        self.jobs = {} # Job id -> DownloadJob, for every job submitted this session
+        self._queue = deque()
+        self._workers = {} # Job id -> running DownloadWorker (several ids share a batch worker)
+        self._site_running = {} # Site -> number of running workers
+        self._site_buckets = {} # Site -> TokenBucket pacing job starts
+        self._paused = False
+        # Wakes the queue when the earliest rate-limited site earns its next token
+        self._retry_timer = QTimer(self)
+        self._retry_timer.setSingleShot(True)
+        self._retry_timer.timeout.connect(self._pump)
+        # Worker output is buffered and delivered in batches while anything is running
+        self._output = OutputCoalescer()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(self.flush_interval_ms)
+        self._flush_timer.timeout.connect(self.flush_output)
+
+    def submit(self, job):
+        self.jobs[job.job_id] = job
+        self._queue.append(job)
+        self._pump()
+
+    def set_max_workers(self, count):
+        self.max_workers = max(1, count)
+        self._pump() # Raising the limit starts waiting jobs right away; lowering it lets running ones finish
+
+    def set_per_site_limit(self, count):
+        self.per_site_limit = max(1, count)
+        self._pump()
+
+    def set_batch_size(self, count):
+        self.batch_size = max(1, count)
+
+    def set_starts_per_minute(self, count):
+        self.starts_per_minute = max(1, count)
+        for bucket in self._site_buckets.values():
+            bucket.rate = self.starts_per_minute / 60
+        self._pump()
+
+    def site_stats(self):
+        """Returns {site: (running, queued)} for every site with active jobs."""
+        stats = {}
+        for site, running in self._site_running.items():
+            if running:
+                stats[site] = (running, 0)
+        for job in self._queue:
+            running, queued = stats.get(job.site, (0, 0))
+            stats[job.site] = (running, queued + 1)
+        return stats
+
+    def pause(self):
+        """Stops starting new jobs; running ones continue."""
+        self._paused = True
+
+    def resume(self):
+        self._paused = False
+        self._pump()
+
+    def running_count(self):
+        return len(set(self._workers.values()))
+
+    def queued_count(self):
+        return len(self._queue)
+
+    def shutdown(self, timeout_ms=None):
+        """
+        Drops queued jobs, cancels running ones and waits for their threads. Workers still
+        running after timeout_ms (by default just over DownloadWorker.cancel_grace, so pooled
+        jobs get their full grace period) are killed, and the wait then continues until every
+        thread has ended: Qt must never destroy a QThread that is still running.
+        """
+        self._paused = True
+        self._retry_timer.stop()
+        self._flush_timer.stop()
+        self._queue.clear()
+        workers = set(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        if timeout_ms is None:
+            timeout_ms = (DownloadWorker.cancel_grace + 2) * 1000
+        deadline = time.monotonic() + timeout_ms / 1000
+        for worker in workers:
+            worker.wait(max(0, int((deadline - time.monotonic()) * 1000)))
+        for worker in workers:
+            if worker.isRunning():
+                worker.kill()
+        for worker in workers:
+            worker.wait()
+
+    def _site_bucket(self, site):
+        bucket = self._site_buckets.get(site)
+        if bucket is None:
+            bucket = self._site_buckets[site] = TokenBucket(self.starts_per_minute / 60, self.site_burst)
+        return bucket
+
+    def _pump(self):
+        if self._paused:
+            return
+        retry_in = None
+        # One pass in FIFO order; a held-back job does not block later jobs for other sites
+        for job in list(self._queue):
+            if job.state != DownloadJob.QUEUED: # Already started as part of an earlier job's batch
+                continue
+            if self.running_count() >= self.max_workers:
+                job.waiting_for = ""
+                continue
+            running = self._site_running.get(job.site, 0)
+            if running >= self.per_site_limit:
+                job.waiting_for = f"{job.site} at {running}/{self.per_site_limit}"
+                continue
+            bucket = self._site_bucket(job.site)
+            if not bucket.try_acquire():
+                wait = bucket.seconds_until_available()
+                retry_in = wait if retry_in is None else min(retry_in, wait)
+                job.waiting_for = f"{job.site} paced, next start in {wait:.0f} s"
+                continue
+            batch = [job]
+            if job.engine == ENGINE_SUBPROCESS and self.batch_size > 1:
+                matching = [other for other in self._queue if other is not job and other.batch_key() == job.batch_key()]
+                # Only share a worker when the group outnumbers the slots it could run in
+                free_slots = min(self.max_workers - self.running_count(), self.per_site_limit - running)
+                size = min(self.batch_size, -(-(len(matching) + 1) // free_slots))
+                batch += matching[:size - 1]
+            for member in batch:
+                self._queue.remove(member)
+            self._start(batch)
+        if retry_in is not None and not self._retry_timer.isActive():
+            self._retry_timer.start(int(retry_in * 1000) + 50)
+        self.queue_changed.emit()
+
+    def _start(self, jobs):
+        worker = self.worker_factory(jobs)
+        # Direct connections run in the worker thread and only touch the lock-protected buffer
+        worker.update_progress.connect(self._output.add_line, Qt.DirectConnection)
+        worker.update_progress.connect(_log_job_line, Qt.DirectConnection)
+        worker.update_transfer.connect(self._output.set_progress, Qt.DirectConnection)
+        worker.download_finished.connect(self._on_finished)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+        site = jobs[0].site
+        self._site_running[site] = self._site_running.get(site, 0) + 1
+        for job in jobs:
+            self._workers[job.job_id] = worker
+            job.state = DownloadJob.RUNNING
+            job.waiting_for = ""
+            self.job_started.emit(job.job_id)
+        worker.start()
+
+    def flush_output(self):
+        """Delivers buffered log lines as one batch and the latest progress of each job."""
+        lines, dropped, progress = self._output.take(self.max_lines_per_flush)
+        if lines or dropped:
+            self.job_output.emit(lines, dropped)
+        for job_id, fields in progress.items():
+            job = self.jobs.get(job_id)
+            if job and job.state == DownloadJob.RUNNING:
+                job.apply_progress(fields)
+                self.job_progress.emit(job_id, job.progress, job.progress_text())
+        if not self._workers and not lines:
+            self._flush_timer.stop() # Everything delivered and nothing left to produce more
+
+    def _on_finished(self, job_id, success, message):
+        self.flush_output() # Show the job's last output and progress before its result
+        job = self.jobs[job_id]
+        job.state = DownloadJob.DONE if success else DownloadJob.FAILED
+        job.progress = 100 if success else job.progress
+        job.message = message
+        worker = self._workers.pop(job_id)
+        if worker not in self._workers.values():
+            # The worker's last job: its final signal is the thread's last act, so this returns at once
+            self._site_running[job.site] -= 1
+            worker.wait()
+            worker.deleteLater()
+        # Listeners see the slot freed before the next job starts (the Windows update swap relies on this)
+        self.job_finished.emit(job_id, success, message)
+        self._pump()
+        if not self._workers and not self._queue:
+            self.queue_drained.emit()
 
 # --- Main Application Window ---
 class YouTubeDownloaderApp(QMainWindow):
+    LOG_VIEW_MAX_LINES = 5000
+    JOBS_VIEW_MAX_FINISHED = 200 # Finished rows kept in the jobs list; queued and running rows always stay
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("YouTube Downloader 3.0")
         self.setGeometry(100, 100, 800, 600) # Window size
 
         self.setup_worker = None # Worker thread for initial setup
-        self.download_worker = None # Worker thread for video download
+        self.update_worker = None # Worker thread for background yt-dlp updates
+        self._shutting_down = False # Set once closing was confirmed; results still arriving are dropped
+        # Queue of video downloads, drained by a pool of DownloadWorkers
+        self.download_scheduler = DownloadScheduler(self.create_download_worker, max_workers=3, parent=self)
+        self.download_scheduler.job_started.connect(self.on_job_started)
+        self.download_scheduler.job_output.connect(self.on_job_output)
+        self.download_scheduler.job_progress.connect(self.on_job_progress)
+        self.download_scheduler.job_finished.connect(self.on_download_finished)
+        self.download_scheduler.queue_changed.connect(self.on_queue_changed)
+        self.engine_pool = None # Pre-warmed yt-dlp processes, created once the tools are ready
+        self.download_scheduler.queue_drained.connect(self.on_queue_drained)
+        self.job_items = {} # Job id -> row in the jobs list
+        self.finished_job_ids = deque() # Finished jobs still listed, oldest first
+        self.pending_yt_dlp_update = None # (staged path, manifest entry) waiting to be swapped in
 
         self.tools_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools")
+        self.log_path = setup_session_log(os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs"))
         self.yt_dlp_exec = None
         self.ffmpeg_exec = None
+        self.aria2c = None # (path, version) of the aria2c found at startup, or None
+        self.aria2_daemon = None # Shared aria2c RPC daemon, when aria2c is available
+        self.aria2_rpc = None # Its client, handed to every job
 
         self.init_ui()
         self.start_tool_setup() # Start automatic tool setup
@@ -300,9 +2992,10 @@ class YouTubeDownloaderApp(QMainWindow):
         url_label = QLabel("Video URL:")
         url_label.setFont(QFont("Inter", 10))
         self.url_input = QLineEdit()
-        self.url_input.setPlaceholderText("Enter YouTube video URL here...")
+        self.url_input.setPlaceholderText("Enter or paste one or more YouTube video URLs here...")
         self.url_input.setFont(QFont("Inter", 10))
         self.url_input.setStyleSheet("border-radius: 8px; padding: 5px; border: 1px solid #ccc;")
+        self.url_input.returnPressed.connect(self.start_download)
         url_layout.addWidget(url_label)
         url_layout.addWidget(self.url_input)
         main_layout.addLayout(url_layout)
@@ -316,7 +3009,64 @@ class YouTubeDownloaderApp(QMainWindow):
         self.format_combo.setFont(QFont("Inter", 10))
         self.format_combo.setStyleSheet("border-radius: 8px; padding: 5px; border: 1px solid #ccc;")
 
-        self.download_button = QPushButton("Download")
+        engine_label = QLabel("Engine:")
+        engine_label.setFont(QFont("Inter", 10))
+        self.engine_combo = QComboBox()
+        self.engine_combo.addItem("Worker processes (pre-warmed)", ENGINE_WORKER_POOL)
+        self.engine_combo.addItem("In-process (yt_dlp module)", ENGINE_IN_PROCESS)
+        self.engine_combo.addItem("Subprocess (yt-dlp executable)", ENGINE_SUBPROCESS)
+        self.engine_combo.setFont(QFont("Inter", 10))
+        self.engine_combo.setStyleSheet("border-radius: 8px; padding: 5px; border: 1px solid #ccc;")
+        self.engine_combo.setToolTip("Worker processes and in-process skip starting a new Python interpreter for every "
+                                     "download; worker processes also keep a crash from taking down the app")
+        self.engine_combo.currentIndexChanged.connect(self.prewarm_engine_pool)
+
+        parallel_label = QLabel("Parallel downloads:")
+        parallel_label.setFont(QFont("Inter", 10))
+        self.parallel_spin = QSpinBox()
+        self.parallel_spin.setRange(1, 8)
+        self.parallel_spin.setValue(self.download_scheduler.max_workers)
+        self.parallel_spin.setFont(QFont("Inter", 10))
+        self.parallel_spin.valueChanged.connect(self.download_scheduler.set_max_workers)
+        self.parallel_spin.valueChanged.connect(self.prewarm_engine_pool)
+
+        site_limit_label = QLabel("Per site:")
+        site_limit_label.setFont(QFont("Inter", 10))
+        self.site_limit_spin = QSpinBox()
+        self.site_limit_spin.setRange(1, 8)
+        self.site_limit_spin.setValue(self.download_scheduler.per_site_limit)
+        self.site_limit_spin.setFont(QFont("Inter", 10))
+        self.site_limit_spin.setToolTip("Most downloads running at once from the same site")
+        self.site_limit_spin.valueChanged.connect(self.download_scheduler.set_per_site_limit)
+
+        site_rate_label = QLabel("Starts/min:")
+        site_rate_label.setFont(QFont("Inter", 10))
+        self.site_rate_spin = QSpinBox()
+        self.site_rate_spin.setRange(1, 600)
+        self.site_rate_spin.setValue(self.download_scheduler.starts_per_minute)
+        self.site_rate_spin.setFont(QFont("Inter", 10))
+        self.site_rate_spin.setToolTip("Most downloads started per minute on the same site, after a short burst")
+        self.site_rate_spin.valueChanged.connect(self.download_scheduler.set_starts_per_minute)
+
+        speed_limit_label = QLabel("Max MiB/s:")
+        speed_limit_label.setFont(QFont("Inter", 10))
+        self.speed_limit_spin = QSpinBox()
+        self.speed_limit_spin.setRange(0, 1000)
+        self.speed_limit_spin.setSpecialValueText("Unlimited")
+        self.speed_limit_spin.setFont(QFont("Inter", 10))
+        self.speed_limit_spin.setToolTip("Total download speed across all jobs (applies to transfers through the shared aria2c)")
+        self.speed_limit_spin.valueChanged.connect(self.set_speed_limit)
+
+        batch_label = QLabel("Batch:")
+        batch_label.setFont(QFont("Inter", 10))
+        self.batch_spin = QSpinBox()
+        self.batch_spin.setRange(1, 200)
+        self.batch_spin.setValue(self.download_scheduler.batch_size)
+        self.batch_spin.setFont(QFont("Inter", 10))
+        self.batch_spin.setToolTip("URLs handed to one yt-dlp process by the subprocess engine (1 = one process per URL)")
+        self.batch_spin.valueChanged.connect(self.download_scheduler.set_batch_size)
+
+        self.download_button = QPushButton("Add to Queue")
         self.download_button.setFont(QFont("Inter", 10, QFont.Bold))
         self.download_button.setStyleSheet("""
             QPushButton {
@@ -344,6 +3094,18 @@ class YouTubeDownloaderApp(QMainWindow):
 
         options_layout.addWidget(format_label)
         options_layout.addWidget(self.format_combo)
+        options_layout.addWidget(engine_label)
+        options_layout.addWidget(self.engine_combo)
+        options_layout.addWidget(parallel_label)
+        options_layout.addWidget(self.parallel_spin)
+        options_layout.addWidget(site_limit_label)
+        options_layout.addWidget(self.site_limit_spin)
+        options_layout.addWidget(site_rate_label)
+        options_layout.addWidget(self.site_rate_spin)
+        options_layout.addWidget(speed_limit_label)
+        options_layout.addWidget(self.speed_limit_spin)
+        options_layout.addWidget(batch_label)
+        options_layout.addWidget(self.batch_spin)
         options_layout.addStretch(1) # Push button to the right
         options_layout.addWidget(self.download_button)
         main_layout.addLayout(options_layout)
@@ -368,20 +3130,58 @@ class YouTubeDownloaderApp(QMainWindow):
         """)
         main_layout.addWidget(self.progress_bar)
 
+        # --- Download Jobs ---
+        self.jobs_list = QListWidget()
+        self.jobs_list.setFont(QFont("Consolas", 9))
+        self.jobs_list.setStyleSheet("border-radius: 8px; padding: 5px;")
+        self.jobs_list.setMaximumHeight(150)
+        main_layout.addWidget(self.jobs_list)
+        self.site_stats_label = QLabel()
+        self.site_stats_label.setFont(QFont("Inter", 9))
+        main_layout.addWidget(self.site_stats_label)
+
         # --- Output Log / Status ---
-        self.output_log = QTextEdit()
+        # Plain text capped at LOG_VIEW_MAX_LINES: the oldest lines fall off the top, the full log is on disk
+        self.output_log = QPlainTextEdit()
         self.output_log.setReadOnly(True)
+        self.output_log.setMaximumBlockCount(self.LOG_VIEW_MAX_LINES)
         self.output_log.setFont(QFont("Consolas", 9))
         self.output_log.setStyleSheet("border-radius: 8px; padding: 5px; background-color: #f0f0f0;")
         main_layout.addWidget(self.output_log)
 
+        log_layout = QHBoxLayout()
+        log_layout.addStretch(1)
+        self.open_log_button = QPushButton("Open Log")
+        self.open_log_button.setFont(QFont("Inter", 9))
+        self.open_log_button.setToolTip("Open the full session log; the view above keeps only the most recent lines")
+        self.open_log_button.clicked.connect(self.open_log_file)
+        log_layout.addWidget(self.open_log_button)
+        main_layout.addLayout(log_layout)
+
         # --- Status Bar (for short messages) ---
         self.statusBar().showMessage("Starting tool setup...")
 
+    def log_message(self, message):
+        """Shows a message in the log view and writes it to the session log file."""
+        self.output_log.appendPlainText(message)
+        session_logger.info("%s", message.strip())
+
+    def open_log_file(self):
+        flush_session_log()
+        QDesktopServices.openUrl(QUrl.fromLocalFile(self.log_path))
+
     def start_tool_setup(self):
         """Initiates the automatic download and setup of yt-dlp and ffmpeg."""
         self.output_log.clear()
-        self.output_log.append("Checking for required tools (yt-dlp, ffmpeg)...")
+        self.log_message("Checking for required tools (yt-dlp, ffmpeg)...")
+
+        # Fast path: the manifest still matches the files, so no thread or re-verification is needed
+        tool_paths = validate_tool_manifest(self.tools_dir)
+        if tool_paths:
+            self.log_message("Tools verified from manifest.")
+            self.on_tools_ready(tool_paths)
+            return
+
         self.download_button.setEnabled(False)
         self.url_input.setEnabled(False)
         self.format_combo.setEnabled(False)
@@ -389,7 +3189,7 @@ class YouTubeDownloaderApp(QMainWindow):
         self.progress_bar.setValue(0)
 
         self.setup_worker = SetupWorker(self.tools_dir)
-        self.setup_worker.update_status.connect(self.output_log.append)
+        self.setup_worker.update_status.connect(self.log_message)
         self.setup_worker.update_progress_bar.connect(self.progress_bar.setValue)
         self.setup_worker.update_progress_bar.connect(lambda val, text: self.progress_bar.setFormat(text))
         self.setup_worker.setup_finished.connect(self.on_tool_setup_finished)
@@ -397,20 +3197,13 @@ class YouTubeDownloaderApp(QMainWindow):
 
     def on_tool_setup_finished(self, success, message):
         """Handles the completion of the tool setup process."""
-        self.output_log.append(f"\n{message}")
+        self.log_message(f"\n{message}")
         self.statusBar().showMessage(message, 5000)
 
         if success:
-            self.yt_dlp_exec = find_executable("yt-dlp", [self.tools_dir])
-            self.ffmpeg_exec = find_executable("ffmpeg", [self.tools_dir])
-
-            if self.yt_dlp_exec and self.ffmpeg_exec:
-                self.download_button.setEnabled(True)
-                self.url_input.setEnabled(True)
-                self.format_combo.setEnabled(True)
-                self.progress_bar.setValue(100)
-                self.progress_bar.setFormat("Tools ready. Enter URL.")
-                self.statusBar().showMessage("Application ready for download.", 3000)
+            tool_paths = validate_tool_manifest(self.tools_dir)
+            if tool_paths:
+                self.on_tools_ready(tool_paths)
             else:
                 QMessageBox.critical(self, "Setup Error", "Required tools not found after setup. Please check logs.")
                 self.progress_bar.setValue(0)
@@ -422,10 +3215,128 @@ class YouTubeDownloaderApp(QMainWindow):
             self.progress_bar.setFormat("Setup Failed!")
             self.statusBar().showMessage("Error: Tool setup failed.", 5000)
 
+    def on_tools_ready(self, tool_paths):
+        """Enables downloading with the verified tool paths."""
+        self.yt_dlp_exec = tool_paths["yt-dlp"]
+        self.ffmpeg_exec = tool_paths["ffmpeg"]
+        self.aria2c = probe_aria2c(self.tools_dir)
+        if self.aria2c:
+            self.log_message(f"Using aria2c {self.aria2c[1]} from {self.aria2c[0]} for transfers.")
+            self.start_aria2_daemon()
+        else:
+            self.log_message("aria2c not found; using yt-dlp's native downloader with "
+                             f"{NATIVE_CONCURRENT_FRAGMENTS} concurrent fragments.")
+        self.download_button.setEnabled(True)
+        self.url_input.setEnabled(True)
+        self.format_combo.setEnabled(True)
+        # Prefer the pre-warmed processes whenever yt_dlp can be imported; the executable stays as the fallback
+        if in_process_engine_available(self.yt_dlp_exec):
+            if not self.engine_pool:
+                self.engine_pool = EngineProcessPool(self.yt_dlp_exec, max_idle=self.parallel_spin.value())
+            self.engine_combo.setCurrentIndex(self.engine_combo.findData(ENGINE_WORKER_POOL))
+            self.prewarm_engine_pool()
+        else:
+            self.engine_combo.setCurrentIndex(self.engine_combo.findData(ENGINE_SUBPROCESS))
+        self.progress_bar.setValue(100)
+        self.progress_bar.setFormat("Tools ready. Enter URL.")
+        self.statusBar().showMessage("Application ready for download.", 3000)
+        self.start_update_check()
+
+    def start_aria2_daemon(self):
+        """Starts the shared aria2c RPC daemon; without it jobs fall back to one aria2c per job."""
+        if self.aria2_daemon:
+            return
+        daemon = Aria2RpcDaemon(self.aria2c[0], self.speed_limit_spin.value() * 1024 * 1024, self.tools_dir)
+        try:
+            daemon.start()
+        except (Aria2RpcError, OSError) as e:
+            self.log_message(f"Could not start the aria2c RPC daemon ({e}); each job will run its own aria2c.")
+            return
+        self.aria2_daemon = daemon
+        self.aria2_rpc = daemon.client
+        self.log_message(f"aria2c RPC daemon running; at most {ARIA2_MAX_ACTIVE_DOWNLOADS} files transfer at once.")
+
+    def set_speed_limit(self, mib_per_sec):
+        if self.aria2_daemon:
+            try:
+                self.aria2_daemon.set_download_limit(mib_per_sec * 1024 * 1024)
+            except Aria2RpcError as e:
+                self.log_message(f"Could not change the speed limit: {e}")
+
+    def start_update_check(self):
+        """Looks for a newer yt-dlp in the background; downloads can start meanwhile."""
+        if self.update_worker and self.update_worker.isRunning():
+            return
+        self.update_worker = YtDlpUpdateWorker(self.tools_dir)
+        self.update_worker.update_status.connect(self.log_message)
+        self.update_worker.update_ready.connect(self.on_yt_dlp_update_ready)
+        self.update_worker.start()
+
+    def on_yt_dlp_update_ready(self, staged_path, update):
+        """Queues the staged yt-dlp build to be swapped in."""
+        self.pending_yt_dlp_update = (staged_path, update)
+        self.apply_pending_update()
+
+    def apply_pending_update(self):
+        """
+        Atomically renames the staged yt-dlp over the installed one. Jobs capture the binary
+        path when they start, so only jobs started after the swap use the new build. POSIX
+        processes keep running from the old file after the rename; Windows cannot replace a
+        running executable, so there the swap waits until no download is running.
+        """
+        if not self.pending_yt_dlp_update:
+            return
+        if sys.platform == "win32" and self.download_scheduler.running_count():
+            self.download_scheduler.pause() # Hold queued jobs so the running ones can drain
+            return
+        staged_path, update = self.pending_yt_dlp_update
+        self.pending_yt_dlp_update = None
+        entry = update["entry"]
+        installed_path = os.path.join(self.tools_dir, entry["file"])
+        try:
+            os.replace(staged_path, installed_path)
+            manifest = load_tool_manifest(self.tools_dir) or {}
+            manifest["yt-dlp"] = entry
+            write_tool_manifest(self.tools_dir, manifest)
+            # From now on the "latest" URL revalidates to 304 until the next release
+            save_validators(self.tools_dir, update["url"], update["headers"])
+        except OSError as e:
+            self.log_message(f"Could not install the yt-dlp update: {e}")
+            return
+        finally:
+            self.download_scheduler.resume()
+        self.yt_dlp_exec = installed_path
+        if self.engine_pool:
+            self.engine_pool.set_yt_dlp_exec(installed_path) # Idle processes restart on the new build
+            self.prewarm_engine_pool()
+        engine = self.engine_combo.currentData()
+        if engine != ENGINE_SUBPROCESS and not zipfile.is_zipfile(installed_path):
+            # Not a zipapp (Windows builds), so the module engines import the pip package instead
+            self.log_message(f"yt-dlp updated to {entry['version']}; the subprocess engine will use it. The "
+                             f"{self.engine_combo.currentText()} engine uses the installed yt_dlp package, "
+                             f"update it with: pip install -U yt-dlp")
+        elif engine == ENGINE_IN_PROCESS:
+            self.log_message(f"yt-dlp updated to {entry['version']}; new downloads will use it once the running ones finish.")
+        else:
+            self.log_message(f"yt-dlp updated to {entry['version']}; new downloads will use it.")
+
+    def prewarm_engine_pool(self):
+        """Starts engine processes ahead of the first job when the worker-process engine is selected."""
+        if self.engine_pool and self.engine_combo.currentData() == ENGINE_WORKER_POOL:
+            self.engine_pool.max_idle = self.parallel_spin.value()
+            self.engine_pool.prewarm(self.parallel_spin.value())
+
+    def create_download_worker(self, jobs):
+        """Builds the worker for jobs leaving the queue, with the tool paths current at that moment."""
+        if len(jobs) > 1:
+            # A batch is one yt-dlp process; with the daemon running it must not start an aria2c of its own
+            return BatchDownloadWorker(jobs, self.yt_dlp_exec, self.ffmpeg_exec, None if self.aria2_rpc else self.aria2c)
+        return DownloadWorker(jobs[0], self.yt_dlp_exec, self.ffmpeg_exec, self.engine_pool, self.aria2c, self.aria2_rpc)
+
     def start_download(self):
-        """Starts the video download process in a separate thread."""
-        url = self.url_input.text().strip()
-        if not url:
+        """Adds the entered URLs (separated by whitespace or newlines) to the download queue."""
+        urls = self.url_input.text().split()
+        if not urls:
             QMessageBox.warning(self, "Empty Input", "Please enter a YouTube video URL.")
             return
 
@@ -438,42 +3349,117 @@ class YouTubeDownloaderApp(QMainWindow):
         output_folder = "downloads" # Can be changed to user input later
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
-            self.output_log.append(f"Directory '{output_folder}' created.\n")
-
-        self.output_log.clear()
-        self.output_log.append("Starting video download process...")
-        self.download_button.setEnabled(False) # Disable button during download
-        self.url_input.setEnabled(False)
-        self.format_combo.setEnabled(False)
-        self.progress_bar.setFormat("Downloading video...")
-        self.progress_bar.setValue(0)
-
-
-        # Create and start the worker thread
-        self.download_worker = DownloadWorker(url, output_folder, format_choice, self.yt_dlp_exec, self.ffmpeg_exec)
-        self.download_worker.update_progress.connect(self.output_log.append)
-        self.download_worker.update_progress_bar.connect(self.progress_bar.setValue)
-        self.download_worker.update_progress_bar.connect(lambda val, text: self.progress_bar.setFormat(text))
-        self.download_worker.download_finished.connect(self.on_download_finished)
-        self.download_worker.start() # Start the thread
-
-    def on_download_finished(self, success, message):
-        """Handles the completion of the video download process."""
-        self.download_button.setEnabled(True) # Re-enable button
-        self.url_input.setEnabled(True)
-        self.format_combo.setEnabled(True)
-        self.output_log.append(f"\n{message}")
-        self.statusBar().showMessage(message, 5000)
-        self.progress_bar.setValue(100 if success else 0)
-        self.progress_bar.setFormat("Done!" if success else "Failed!")
-
-        if not success:
-            QMessageBox.critical(self, "Download Failed", message)
+            self.log_message(f"Directory '{output_folder}' created.\n")
+
+        self.url_input.clear() # Ready for the next URL while these wait or download
+        self.download_scheduler.pause() # Queue the whole paste before anything starts, so it can be batched
+        for url in urls:
+            job = DownloadJob(url, output_folder, format_choice, self.engine_combo.currentData())
+            self.jobs_list.addItem(job.describe())
+            self.job_items[job.job_id] = self.jobs_list.item(self.jobs_list.count() - 1)
+            self.log_message(f"[#{job.job_id}] Queued {url}")
+            self.download_scheduler.submit(job)
+        if not self.pending_yt_dlp_update: # A pending Windows swap keeps the queue paused
+            self.download_scheduler.resume()
+        self.update_queue_progress()
+
+    def refresh_job_item(self, job_id):
+        self.job_items[job_id].setText(self.download_scheduler.jobs[job_id].describe())
+
+    def update_queue_progress(self):
+        """Shows the average progress of queued and running jobs on the main progress bar."""
+        active = [job for job in self.download_scheduler.jobs.values()
+                  if job.state in (DownloadJob.QUEUED, DownloadJob.RUNNING)]
+        if not active:
+            return
+        self.progress_bar.setValue(sum(job.progress for job in active) // len(active))
+        self.progress_bar.setFormat(f"{self.download_scheduler.running_count()} downloading, "
+                                    f"{self.download_scheduler.queued_count()} queued - %p%")
+
+    def on_queue_changed(self):
+        """Refreshes waiting reasons and the per-site load line."""
+        for job in self.download_scheduler.jobs.values():
+            if job.state == DownloadJob.QUEUED:
+                self.refresh_job_item(job.job_id)
+        stats = self.download_scheduler.site_stats()
+        self.site_stats_label.setText("  ".join(
+            f"{site}: {running}/{self.download_scheduler.per_site_limit} running, {queued} waiting"
+            for site, (running, queued) in sorted(stats.items())))
+
+    def on_job_started(self, job_id):
+        self.refresh_job_item(job_id)
+        self.update_queue_progress()
+
+    def on_job_output(self, lines, dropped):
+        """Appends one batch of worker output with a single document update."""
+        text = [f"[... {dropped} lines of output skipped ...]"] if dropped else []
+        text.extend(f"[#{job_id}] {line.rstrip()}" for job_id, line in lines)
+        self.output_log.appendPlainText("\n".join(text)) # Already in the log file, written by the workers
+
+    def on_job_progress(self, job_id, value, text):
+        self.refresh_job_item(job_id)
+        self.update_queue_progress()
+
+    def on_download_finished(self, job_id, success, message):
+        """Handles the completion of one queued download."""
+        if self._shutting_down:
+            return # Cancelled by closeEvent, not a result to report or swap an update after
+        self.apply_pending_update() # Between jobs is the safe moment for a deferred swap
+        self.refresh_job_item(job_id)
+        self.prune_finished_job_items(job_id)
+        self.log_message(f"[#{job_id}] {message}")
+        self.statusBar().showMessage(f"#{job_id}: {message}", 5000)
+        self.update_queue_progress()
+
+    def prune_finished_job_items(self, job_id):
+        """Records a finished job's row and drops the oldest finished rows beyond JOBS_VIEW_MAX_FINISHED,
+        so the list stays bounded however many downloads a session runs (results stay in the log)."""
+        self.finished_job_ids.append(job_id)
+        while len(self.finished_job_ids) > self.JOBS_VIEW_MAX_FINISHED:
+            item = self.job_items.pop(self.finished_job_ids.popleft())
+            self.jobs_list.takeItem(self.jobs_list.row(item))
+
+    def on_queue_drained(self):
+        """Summarises the batch once nothing is queued or running."""
+        if self._shutting_down:
+            return # The drain was caused by quitting; a failure summary would only block the exit
+        jobs = self.download_scheduler.jobs.values()
+        failed = [job for job in jobs if job.state == DownloadJob.FAILED]
+        done = sum(1 for job in jobs if job.state == DownloadJob.DONE)
+        self.progress_bar.setValue(100 if not failed else 0)
+        self.progress_bar.setFormat("Done!" if not failed else "Finished with errors")
+        # Jobs are summarised once; later batches only report their own results
+        self.download_scheduler.jobs.clear()
+        if failed:
+            details = "\n".join(f"#{job.job_id} {job.url}: {job.message}" for job in failed)
+            QMessageBox.critical(self, "Download Failed", f"{done} completed, {len(failed)} failed:\n{details}")
         else:
-            QMessageBox.information(self, "Download Complete", message)
+            QMessageBox.information(self, "Download Complete", f"{done} download(s) completed successfully!")
+
+    def closeEvent(self, event):
+        """Stops running downloads and waits for every worker thread before closing."""
+        busy = self.download_scheduler.running_count() + self.download_scheduler.queued_count()
+        if busy and QMessageBox.question(
+                self, "Downloads in Progress",
+                f"{busy} download(s) are still queued or running. Cancel them and quit?") != QMessageBox.Yes:
+            event.ignore()
+            return
+        self._shutting_down = True
+        self.download_scheduler.shutdown()
+        if self.engine_pool:
+            self.engine_pool.shutdown()
+        if self.aria2_daemon:
+            self.aria2_daemon.shutdown()
+        for worker in (self.setup_worker, self.update_worker):
+            if worker and worker.isRunning():
+                worker.cancel()
+                worker.wait() # Destroying a running QThread aborts the app; cancel() makes this wait short
+        flush_session_log()
+        event.accept()
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # Engine processes re-enter here in frozen builds
     app = QApplication(sys.argv)
     window = YouTubeDownloaderApp()
     window.show()
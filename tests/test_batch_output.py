@@ -0,0 +1,102 @@
+"""
+BatchDownloadWorker splitting one yt-dlp process's output back into per-job results, driven by
+a stand-in yt-dlp that prints a scripted transcript.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import textwrap
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from main import BatchDownloadWorker, DownloadJob # noqa: E402
+
+URL_A = "https://www.youtube.com/watch?v=aaaaaaaaaaa"
+URL_B = "https://www.youtube.com/watch?v=bbbbbbbbbbb"
+URL_C = "https://www.youtube.com/watch?v=ccccccccccc"
+LONG_URL = "https://example.com/videos/" + "x" * 200 + "/watch.mp4"
+DONE = BatchDownloadWorker.DONE_MARKER
+
+
+def _jobs(*urls):
+    return [DownloadJob(url, "/tmp", "best") for url in urls]
+
+
+@pytest.mark.parametrize("printed, pending, expected", [
+    (URL_B, (URL_A, URL_B), 1),
+    (LONG_URL[:40] + "..." + LONG_URL[-20:], (URL_A, LONG_URL), 1), # yt-dlp shortens long URLs
+    (URL_A[:30] + "..." + URL_B[-5:], (URL_A, URL_B), 1), # Both ends must match
+    ("https://www.youtube.com/watch?v=entry000001", (URL_A, URL_B), None), # A playlist entry
+    (URL_A, (URL_B,), None), # Only pending jobs are candidates
+])
+def test_match_job(printed, pending, expected):
+    jobs = _jobs(*pending)
+    worker = BatchDownloadWorker(jobs, "yt-dlp", "ffmpeg")
+    match = worker._match_job(printed, jobs)
+    assert match is (jobs[expected] if expected is not None else None)
+
+
+@pytest.mark.parametrize("urls, transcript, exit_code, expected", [
+    # Every URL announced and confirmed
+    ((URL_A, URL_B),
+     [f"[youtube] Extracting URL: {URL_A}", f"{DONE}{URL_A}", f"[youtube] Extracting URL: {URL_B}", f"{DONE}{URL_B}"],
+     0, [(True, "Download completed successfully!"), (True, "Download completed successfully!")]),
+    # An ERROR line belongs to the URL being worked on
+    ((URL_A, URL_B),
+     [f"[youtube] Extracting URL: {URL_A}", "ERROR: [youtube] aaaaaaaaaaa: Video unavailable",
+      f"[youtube] Extracting URL: {URL_B}", f"{DONE}{URL_B}"],
+     1, [(False, "ERROR: [youtube] aaaaaaaaaaa: Video unavailable"), (True, "Download completed successfully!")]),
+    # Before the first marker yt-dlp is still on the first URL, e.g. one it cannot parse
+    (("not a url", URL_B),
+     ["ERROR: [generic] 'not a url' is not a valid URL", f"[youtube] Extracting URL: {URL_B}", f"{DONE}{URL_B}"],
+     1, [(False, "ERROR: [generic] 'not a url' is not a valid URL"), (True, "Download completed successfully!")]),
+    # A URL yt-dlp never announced before moving on
+    ((URL_A, URL_B, URL_C),
+     [f"[youtube] Extracting URL: {URL_A}", f"{DONE}{URL_A}", f"[youtube] Extracting URL: {URL_C}", f"{DONE}{URL_C}"],
+     0, [(True, "Download completed successfully!"), (False, "yt-dlp skipped this URL."),
+         (True, "Download completed successfully!")]),
+    # Truncated marker URLs still open the right segment
+    ((URL_A, LONG_URL),
+     [f"[youtube] Extracting URL: {URL_A}", f"{DONE}{URL_A}",
+      f"[generic] Extracting URL: {LONG_URL[:40]}...{LONG_URL[-20:]}", f"{DONE}{LONG_URL}"],
+     0, [(True, "Download completed successfully!"), (True, "Download completed successfully!")]),
+    # Playlist entries are announced too, but stay inside the playlist's job
+    ((URL_A, URL_B),
+     [f"[youtube:tab] Extracting URL: {URL_A}", "[youtube] Extracting URL: https://www.youtube.com/watch?v=entry000001",
+      f"{DONE}https://www.youtube.com/watch?v=entry000001", f"[youtube] Extracting URL: {URL_B}", f"{DONE}{URL_B}"],
+     0, [(True, "Download completed successfully!"), (True, "Download completed successfully!")]),
+    # yt-dlp exits before reaching the last URL
+    ((URL_A, URL_B),
+     [f"[youtube] Extracting URL: {URL_A}", f"{DONE}{URL_A}"],
+     2, [(True, "Download completed successfully!"), (False, "yt-dlp exited with code 2 before finishing this URL.")]),
+])
+def test_batch_output_demux(tmp_path, urls, transcript, exit_code, expected):
+    if sys.platform == "win32":
+        pytest.skip("the stand-in yt-dlp is a script run through its shebang")
+    fake_yt_dlp = tmp_path / "yt-dlp"
+    fake_yt_dlp.write_text(textwrap.dedent(f"""\
+        #!{sys.executable}
+        import sys
+        sys.stdin.read()
+        for line in {transcript!r}:
+            print(line, flush=True)
+        sys.exit({exit_code})
+        """))
+    fake_yt_dlp.chmod(0o755)
+    jobs = _jobs(*urls)
+    worker = BatchDownloadWorker(jobs, str(fake_yt_dlp), "ffmpeg")
+    finished = []
+    output = {job.job_id: [] for job in jobs}
+    worker.download_finished.connect(lambda job_id, success, message: finished.append((job_id, success, message)))
+    worker.update_progress.connect(lambda job_id, line: output[job_id].append(line))
+
+    worker.run() # In this thread: the demux is plain sequential code
+
+    results = {job_id: (success, message) for job_id, success, message in finished}
+    assert len(finished) == len(jobs) # Exactly one result per job
+    assert [results[job.job_id] for job in jobs] == expected
+    for job, (success, message) in zip(jobs, expected):
+        if message.startswith("ERROR:"):
+            assert any(line.strip() == message for line in output[job.job_id])
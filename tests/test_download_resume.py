@@ -0,0 +1,151 @@
+"""
+SetupWorker._download_file against a local HTTP server that misbehaves the way real mirrors do:
+connections dropped mid-body, stale partial files, and servers that ignore Range, for both
+single-stream and segmented downloads.
+
+    python -m pytest tests
+"""
+import hashlib
+import http.server
+import os
+import re
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from main import SetupWorker # noqa: E402
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 123)
+CHECKSUM = ("sha256", hashlib.sha256(PAYLOAD).hexdigest())
+
+
+class FlakyServer:
+    """Serves PAYLOAD, optionally cutting the first 'drops' responses after 'drop_after' bytes
+    or answering every request with the whole file (a server without Range support)."""
+
+    def __init__(self, drop_after=None, drops=1, honour_range=True):
+        self.drop_after = drop_after
+        self.drops = drops
+        self.honour_range = honour_range
+        self.ranges = [] # Range header of every request, None when there was none
+        owner = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                owner.handle(self)
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/tool"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def handle(self, request):
+        range_header = request.headers.get("Range")
+        self.ranges.append(range_header)
+        start, end = 0, len(PAYLOAD) - 1
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", range_header or "")
+        if match and self.honour_range:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), end) if match.group(2) else end
+            if start >= len(PAYLOAD):
+                request.send_response(416)
+                request.send_header("Content-Range", f"bytes */{len(PAYLOAD)}")
+                request.send_header("Content-Length", "0")
+                request.end_headers()
+                return
+            request.send_response(206)
+            request.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+        else:
+            request.send_response(200)
+        request.send_header("Content-Length", str(end + 1 - start))
+        request.send_header("ETag", '"v1"')
+        request.end_headers()
+        body = PAYLOAD[start:end + 1]
+        if self.drop_after is not None and self.drops > 0:
+            self.drops -= 1
+            request.wfile.write(body[:self.drop_after])
+            request.wfile.flush()
+            request.close_connection = True
+            return
+        request.wfile.write(body)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def worker(tmp_path):
+    setup_worker = SetupWorker(str(tmp_path), store_dir=str(tmp_path / "store"))
+    setup_worker.resume_delay = 0
+    return setup_worker
+
+
+def _download(worker, server, tmp_path, **kwargs):
+    destination = str(tmp_path / "tool")
+    try:
+        worker._download_file(server.url, destination, "yt-dlp", checksum=CHECKSUM, **kwargs)
+    finally:
+        server.close()
+    with open(destination, 'rb') as f:
+        assert f.read() == PAYLOAD
+    assert not os.path.exists(destination + ".part")
+    return destination
+
+
+def test_dropped_connection_resumes_with_range(worker, tmp_path):
+    server = FlakyServer(drop_after=1024 * 1024)
+    _download(worker, server, tmp_path)
+    assert server.ranges == [None, f"bytes={1024 * 1024}-"]
+
+
+def test_stale_part_file_answered_with_416_restarts(worker, tmp_path):
+    # Left over from a larger, older build: the resume offset lies past the end of the new file
+    with open(tmp_path / "tool.part", 'wb') as f:
+        f.write(os.urandom(len(PAYLOAD) + 10))
+    server = FlakyServer()
+    _download(worker, server, tmp_path)
+    assert server.ranges == [f"bytes={len(PAYLOAD) + 10}-", None]
+
+
+def test_server_ignoring_range_is_downloaded_from_scratch(worker, tmp_path):
+    with open(tmp_path / "tool.part", 'wb') as f:
+        f.write(b"x" * 4096) # Wrong bytes: would corrupt the file if the 200 body were appended
+    server = FlakyServer(honour_range=False)
+    _download(worker, server, tmp_path)
+    assert server.ranges == ["bytes=4096-"]
+
+
+def test_failed_segmented_download_resumes_every_range(worker, tmp_path):
+    worker.min_segment_size = 512 * 1024
+    worker.max_resume_attempts = 0
+    destination = str(tmp_path / "tool")
+    server = FlakyServer(drop_after=100000, drops=5) # The probe, then every segment cut short
+    with pytest.raises(Exception):
+        worker._download_segmented(server.url, destination, "FFmpeg", 4, CHECKSUM)
+    server.close()
+    assert os.path.exists(destination + ".segments.json")
+
+    # Like an app restart: a fresh attempt continues each range where it stopped
+    worker.max_resume_attempts = 5
+    server = FlakyServer()
+    _download(worker, server, tmp_path, segments=4)
+    starts = sorted(int(re.match(r"bytes=(\d+)-", header).group(1)) for header in server.ranges[1:])
+    segment_size = len(PAYLOAD) // 4
+    assert starts == [i * segment_size + 100000 for i in range(4)]
+    assert not os.path.exists(destination + ".segments.json")
+
+
+def test_failed_segmented_download_falls_back_to_one_stream(worker, tmp_path):
+    worker.min_segment_size = 512 * 1024
+    worker.max_resume_attempts = 0
+    server = FlakyServer(drop_after=100000, drops=5)
+    _download(worker, server, tmp_path, segments=4)
+    # The first segment's bytes are the longest complete prefix, so the single stream starts there
+    assert server.ranges[-1] == "bytes=100000-"
@@ -0,0 +1,55 @@
+"""
+parse_progress_line on the lines the subprocess engine reads: PROGRESS_TEMPLATE output (where
+yt-dlp prints fields it does not know as a bare NA), aria2c status lines, and everything else.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from main import PROGRESS_FIELDS, PROGRESS_MARKER, parse_progress_line # noqa: E402
+
+URL = "https://www.youtube.com/watch?v=aaaaaaaaaaa"
+
+
+def _template_line(**values):
+    """A PROGRESS_TEMPLATE line as yt-dlp prints it; values are already JSON (or NA) text."""
+    body = ",".join(f'"{field}":{values.get(field, "NA")}' for field in PROGRESS_FIELDS)
+    return f'{PROGRESS_MARKER}{{{body},"url":"{URL}"}}\n'
+
+
+@pytest.mark.parametrize("line, expected", [
+    # Every field known
+    (_template_line(status='"downloading"', downloaded_bytes="1048576", total_bytes="4194304",
+                    total_bytes_estimate="4194304", speed="524288.5", eta="6", fragment_index="1", fragment_count="4"),
+     {"status": "downloading", "downloaded_bytes": 1048576, "total_bytes": 4194304, "total_bytes_estimate": 4194304,
+      "speed": 524288.5, "eta": 6, "fragment_index": 1, "fragment_count": 4, "url": URL}),
+    # Size only estimated, no fragments: the unknown fields are NA, not JSON
+    (_template_line(status='"downloading"', downloaded_bytes="2048", total_bytes_estimate="10240.0", speed="NA", eta="NA"),
+     {"status": "downloading", "downloaded_bytes": 2048, "total_bytes": None, "total_bytes_estimate": 10240.0,
+      "speed": None, "eta": None, "fragment_index": None, "fragment_count": None, "url": URL}),
+    # Nothing known yet except the status
+    (_template_line(status='"downloading"'),
+     {"status": "downloading", "downloaded_bytes": None, "total_bytes": None, "total_bytes_estimate": None,
+      "speed": None, "eta": None, "fragment_index": None, "fragment_count": None, "url": URL}),
+    # A cut-off line is ignored rather than raising
+    (_template_line(status='"downloading"')[:40], None),
+    # aria2c status lines, with and without speed and ETA
+    ("[#2089b0 12MiB/80MiB(15%) CN:16 DL:3.1MiB ETA:21s]\n",
+     {"status": "downloading", "downloaded_bytes": 12 * 1024 ** 2, "total_bytes": 80 * 1024 ** 2,
+      "speed": 3.1 * 1024 ** 2, "eta": 21}),
+    ("[#2089b0 1.5GiB/2.0GiB(75%) CN:8 DL:10MiB ETA:1m5s]\n",
+     {"status": "downloading", "downloaded_bytes": int(1.5 * 1024 ** 3), "total_bytes": 2 * 1024 ** 3,
+      "speed": 10 * 1024 ** 2, "eta": 65}),
+    ("[#2089b0 0B/0B(0%) CN:1]\n",
+     {"status": "downloading", "downloaded_bytes": 0, "total_bytes": 0, "speed": None, "eta": None}),
+    # Ordinary output, including yt-dlp's own percentage lines, carries no fields
+    ("[download]  42.0% of 10.00MiB at 1.00MiB/s ETA 00:06\n", None),
+    ("[#2089b0 SEED(0.0) CN:1]\n", None),
+    ("ERROR: [youtube] aaaaaaaaaaa: Video unavailable\n", None),
+])
+def test_parse_progress_line(line, expected):
+    assert parse_progress_line(line) == expected